@@ -5,6 +5,7 @@ from fastapi import APIRouter, HTTPException
 import logging
 
 from app import state
+from app.models import StartQuestionRequest, StopQuestionRequest
 from app.core.session import (
     start_question, stop_question, get_question_session,
     get_all_sessions_status, reset_all_questions
@@ -17,7 +18,7 @@ router = APIRouter(prefix="/admin", tags=["admin"])
 
 
 @router.post("/start-question")
-async def start_question_endpoint(request: dict):
+async def start_question_endpoint(request: StartQuestionRequest):
     """
     Admin: Start a question with timer
     
@@ -28,15 +29,15 @@ async def start_question_endpoint(request: dict):
             "buffer_time": 10   # optional, default 10
         }
     """
-    question_id = request.get("question_id")
-    time_limit = request.get("time_limit", 300)
-    buffer_time = request.get("buffer_time", 10)
+    question_id = request.question_id
+    time_limit = request.time_limit
+    buffer_time = request.buffer_time
     
     if not question_id:
         raise HTTPException(status_code=400, detail="question_id required")
     
     # Check if question exists in GT_TABLE
-    if state.GT_TABLE is None or question_id not in state.GT_TABLE:
+    if not state.GT_TABLE or state.GT_TABLE.get(question_id) is None:
         raise HTTPException(status_code=404, detail=f"Question {question_id} not found in groundtruth")
     
     # Start question session
@@ -53,14 +54,14 @@ async def start_question_endpoint(request: dict):
 
 
 @router.post("/stop-question")
-async def stop_question_endpoint(request: dict):
+async def stop_question_endpoint(request: StopQuestionRequest):
     """
     Admin: Stop a question immediately
     
     Request:
         {"question_id": 1}
     """
-    question_id = request.get("question_id")
+    question_id = request.question_id
     
     if not question_id:
         raise HTTPException(status_code=400, detail="question_id required")
@@ -71,14 +72,11 @@ async def stop_question_endpoint(request: dict):
     
     stop_question(question_id)
     
-    completed = sum(1 for ts in session.team_submissions.values() if ts.is_completed)
-    total_subs = sum(len(ts.submit_times) for ts in session.team_submissions.values())
-    
     return {
         "success": True,
         "question_id": question_id,
-        "total_submissions": total_subs,
-        "completed_teams": completed,
+        "total_submissions": session.total_submissions,
+        "completed_teams": session.completed_count,
         "message": f"Question {question_id} stopped."
     }
 
@@ -2,13 +2,15 @@
 Configuration endpoints
 """
 import logging
-from fastapi import APIRouter, HTTPException
+from typing import Dict
+from fastapi import APIRouter, HTTPException, Request
 
 from app import state
+from app.api.responses import etag_response
 from app.core.session import (
     get_current_active_question_id,
     get_question_session,
-    is_question_active,
+    session_is_accepting,
 )
 
 
@@ -17,40 +19,73 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["config"])
 
 
-@router.get("/config")
-async def get_config():
-    """Get current active question configuration and all questions info"""
-    if state.GT_TABLE is None:
-        raise HTTPException(status_code=500, detail="Ground truth table is not loaded")
-    
-    active_question_id = get_current_active_question_id()
-    active_gt = state.GT_TABLE.get(active_question_id) if active_question_id else None
-    active_session = get_question_session(active_question_id) if active_question_id else None
-    
+def rebuild_config_cache() -> Dict:
+    """
+    Build the static part of the /config response
+
+    GT_TABLE and SCORING_PARAMS only change at startup, so the questions map
+    and scoring defaults are computed once and reused by every request.
+    """
     base_params = state.SCORING_PARAMS
-    
-    return {
-        "active_question_id": active_question_id,
-        "active_question": {
-            "type": active_gt.type,
-            "video_id": active_gt.video_id,
-            "scene_id": active_gt.scene_id,
-            "num_events": len(active_gt.points) // 2,
-            "time_limit": active_session.time_limit if active_session else base_params.time_limit,
-            "buffer_time": active_session.buffer_time if active_session else base_params.buffer_time,
-            "is_active": is_question_active(active_question_id) if active_question_id else False,
-        } if active_gt else None,
-        "scoring": base_params.dict(),
+    state.CONFIG_CACHE = {
+        "scoring": {
+            "p_max": base_params.p_max,
+            "p_base": base_params.p_base,
+            "p_penalty": base_params.p_penalty,
+            "time_limit": base_params.time_limit,
+            "buffer_time": base_params.buffer_time,
+        },
         "questions": {
             qid: {
                 "type": gt.type,
                 "video_id": gt.video_id,
                 "scene_id": gt.scene_id,
                 "points": gt.points,
-                "num_events": len(gt.points) // 2,
+                "num_events": gt.num_events,
                 "default_time_limit": base_params.time_limit,
                 "default_buffer_time": base_params.buffer_time,
             }
-            for qid, gt in state.GT_TABLE.items()
+            for qid, gt in (state.GT_TABLE or {}).items()
         }
     }
+    return state.CONFIG_CACHE
+
+
+@router.get("/config")
+async def get_config(request: Request):
+    """
+    Get current active question configuration and all questions info
+
+    Served with an ETag derived from the admin change counter plus the
+    active question state, so unchanged polls get a 304.
+    """
+    if state.GT_TABLE is None:
+        raise HTTPException(status_code=500, detail="Ground truth table is not loaded")
+    
+    cached = state.CONFIG_CACHE or rebuild_config_cache()
+    
+    active_question_id = get_current_active_question_id()
+    active_gt = state.GT_TABLE.get(active_question_id) if active_question_id else None
+    active_session = get_question_session(active_question_id) if active_question_id else None
+    is_active = session_is_accepting(active_session) if active_session else False
+    
+    base_params = state.SCORING_PARAMS
+    
+    def build_content():
+        return {
+            "active_question_id": active_question_id,
+            "active_question": {
+                "type": active_gt.type,
+                "video_id": active_gt.video_id,
+                "scene_id": active_gt.scene_id,
+                "num_events": active_gt.num_events,
+                "time_limit": active_session.time_limit if active_session else base_params.time_limit,
+                "buffer_time": active_session.buffer_time if active_session else base_params.buffer_time,
+                "is_active": is_active,
+            } if active_gt else None,
+            "scoring": cached["scoring"],
+            "questions": cached["questions"]
+        }
+    
+    etag = f'W/"config-{state.CONFIG_VERSION}-{active_question_id}-{int(is_active)}"'
+    return etag_response(request, etag, build_content)
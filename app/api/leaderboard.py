@@ -1,49 +1,117 @@
 """
 Leaderboard and UI endpoints
 """
-from fastapi import APIRouter
-from fastapi.responses import HTMLResponse
+from dataclasses import dataclass
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, Response
+from itertools import chain
+from typing import Dict, List, Optional
+import gzip
+import hashlib
+import orjson
 import os
 
 from app import state
-from app.core.session import get_question_session, get_current_active_question_id
+from app.api.responses import accepts_gzip
+from app.core.session import get_question_session, get_current_active_question_id, get_question_leaderboard
 from app.services.team_registry import get_team_name
 
 
 router = APIRouter(tags=["leaderboard"])
 
+# Static HTML pages, loaded at startup (preload_html_pages) and served from memory
+_HTML_PAGES = ("static/leaderboard.html", "static/admin.html")
 
-@router.get("/api/leaderboard-data")
-async def get_leaderboard_data():
+
+@dataclass(frozen=True, slots=True)
+class _HtmlPage:
+    """A UI page held in memory: raw bytes, gzip variant and an ETag for each"""
+    body: bytes
+    gzip_body: bytes
+    etag: str
+    gzip_etag: str  # Strong validators must differ per Content-Encoding
+
+
+_HTML_CACHE: Dict[str, Optional[_HtmlPage]] = {}
+
+
+def _load_html(html_path: str) -> Optional[_HtmlPage]:
+    """Read and precompress a page into the cache (None if missing)"""
+    page = None
+    if os.path.exists(html_path):
+        with open(html_path, "rb") as f:
+            body = f.read()
+        digest = hashlib.md5(body, usedforsecurity=False).hexdigest()
+        page = _HtmlPage(
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=9),
+            etag=f'"{digest}"',
+            gzip_etag=f'"{digest}-gz"'
+        )
+    _HTML_CACHE[html_path] = page
+    return page
+
+
+def preload_html_pages() -> None:
+    """Load the UI pages once at startup so handlers never touch the disk"""
+    for html_path in _HTML_PAGES:
+        _load_html(html_path)
+
+
+def _read_html(html_path: str) -> Optional[_HtmlPage]:
+    """Return the cached page (None if missing); loads on first use if not preloaded"""
+    try:
+        return _HTML_CACHE[html_path]
+    except KeyError:
+        return _load_html(html_path)
+
+
+def _html_response(request: Request, html_path: str, not_found: str) -> Response:
     """
-    Get comprehensive leaderboard data for all questions
-    
-    Returns data for rendering leaderboard UI with:
-    - All questions
-    - All teams (real + fake)
-    - Submission counts (✅ correct, ❌ wrong)
-    - Scores per question
-    - Total scores
+    Serve a cached page: the gzip variant when the client accepts it (q > 0),
+    plain bytes otherwise; 304 when If-None-Match matches that variant's ETag.
+    Both variants (and the 304) carry Vary: Accept-Encoding.
     """
-    if not state.GT_TABLE:
-        return {"questions": [], "teams": []}
+    page = _read_html(html_path)
+    if page is None:
+        return HTMLResponse(content=not_found, status_code=404)
+    
+    use_gzip = accepts_gzip(request.headers.get("accept-encoding", ""))
+    etag = page.gzip_etag if use_gzip else page.etag
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
     
-    all_questions = sorted(state.GT_TABLE.keys())
+    # Content-Encoding already set, so GZipMiddleware leaves the body alone
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return HTMLResponse(content=page.gzip_body, headers=headers)
+    return HTMLResponse(content=page.body, headers=headers)
+
+
+# Encoded /api/leaderboard-data body, reused while state.LEADERBOARD_VERSION
+# and the active question are unchanged
+_LEADERBOARD_CACHE: Dict = {"version": None, "active": None, "body": b""}
+
+
+def _build_teams_list() -> List[Dict]:
+    """Aggregate per-question submissions into leaderboard rows sorted by total score"""
     teams_data = {}
     
     # Collect data from all sessions
-    for q_id in all_questions:
+    for q_id in state.GT_QUESTION_IDS:
         session = get_question_session(q_id)
         if not session:
             continue
         
-        # Merge real teams + fake teams
-        all_teams = {**session.team_submissions, **session.fake_teams}
+        # Walk real teams + fake teams without building a merged dict
+        all_teams = chain(session.team_submissions.items(), session.fake_teams.items())
         
-        for team_id, team_sub in all_teams.items():
-            if team_id not in teams_data:
+        for team_id, team_sub in all_teams:
+            team_row = teams_data.get(team_id)
+            if team_row is None:
                 display_name = team_sub.team_name or get_team_name(team_id)
-                teams_data[team_id] = {
+                team_row = teams_data[team_id] = {
                     "team_name": display_name or team_id,
                     "is_real": bool(team_sub.team_session_id),
                     "questions": {},
@@ -51,14 +119,14 @@ async def get_leaderboard_data():
                 }
             
             # Add question data
-            teams_data[team_id]["questions"][q_id] = {
+            team_row["questions"][q_id] = {
                 "wrong_count": team_sub.wrong_count,
                 "correct_count": team_sub.correct_count,
-                "score": round(team_sub.final_score, 1) if team_sub.final_score else 0
+                "score": team_sub.rounded_score
             }
             
             # Accumulate total score
-            teams_data[team_id]["total_score"] += (team_sub.final_score or 0)
+            team_row["total_score"] += (team_sub.final_score or 0)
     
     # Sort teams by total score (descending)
     teams_list = sorted(
@@ -67,44 +135,80 @@ async def get_leaderboard_data():
         reverse=True
     )
     
-    # Round total scores
+    # Round total scores (after summing, so totals don't accumulate rounding error)
     for team in teams_list:
         team["total_score"] = round(team["total_score"], 1)
     
+    return teams_list
+
+
+@router.get("/api/leaderboard-data")
+async def get_leaderboard_data():
+    """
+    Get comprehensive leaderboard data for all questions
+    
+    Returns data for rendering leaderboard UI with:
+    - All questions
+    - All teams (real + fake)
+    - Submission counts (✅ correct, ❌ wrong)
+    - Scores per question
+    - Total scores
+    
+    The encoded body is shared by all pollers. Any write (submission, new
+    session or team, reset) bumps state.LEADERBOARD_VERSION and invalidates
+    it at once; it is also rebuilt when the active question changes (e.g. a
+    question runs out of time, which is not a write).
+    """
+    if not state.GT_TABLE:
+        return {"questions": [], "teams": []}
+    
     active_question_id = get_current_active_question_id()
+    cache = _LEADERBOARD_CACHE
+    stale = cache["version"] != state.LEADERBOARD_VERSION or cache["active"] != active_question_id
+    if stale:
+        # Read the version first: a write during the build only makes the next poll rebuild
+        version = state.LEADERBOARD_VERSION
+        cache["body"] = orjson.dumps({
+            "active_question_id": active_question_id,
+            "questions": state.GT_QUESTION_IDS,
+            "teams": _build_teams_list()
+        }, option=orjson.OPT_NON_STR_KEYS)
+        cache["version"] = version
+        cache["active"] = active_question_id
+    
+    return Response(cache["body"], media_type="application/json")
+
+
+@router.get("/api/leaderboard/{question_id}")
+async def get_question_leaderboard_data(question_id: int, limit: Optional[int] = Query(None, ge=1)):
+    """
+    Ranking of the real teams that completed one question
     
+    ?limit=N returns only the top N rows.
+    """
+    if get_question_session(question_id) is None:
+        raise HTTPException(status_code=404, detail=f"Question {question_id} not started")
     return {
-        "active_question_id": active_question_id,
-        "questions": all_questions,
-        "teams": teams_list
+        "question_id": question_id,
+        "teams": get_question_leaderboard(question_id, top_k=limit)
     }
 
 
 @router.get("/leaderboard-ui", response_class=HTMLResponse)
-async def leaderboard_ui():
+async def leaderboard_ui(request: Request):
     """Serve the leaderboard HTML page"""
-    html_path = "static/leaderboard.html"
-    
-    if not os.path.exists(html_path):
-        return HTMLResponse(
-            content="<h1>Leaderboard UI not found</h1><p>Please create static/leaderboard.html</p>",
-            status_code=404
-        )
-    
-    with open(html_path, "r", encoding="utf-8") as f:
-        return HTMLResponse(content=f.read())
+    return _html_response(
+        request,
+        "static/leaderboard.html",
+        "<h1>Leaderboard UI not found</h1><p>Please create static/leaderboard.html</p>"
+    )
 
 
 @router.get("/admin-dashboard", response_class=HTMLResponse)
-async def admin_dashboard():
+async def admin_dashboard(request: Request):
     """Serve the admin dashboard HTML page"""
-    html_path = "static/admin.html"
-    
-    if not os.path.exists(html_path):
-        return HTMLResponse(
-            content="<h1>Admin Dashboard not found</h1><p>Please create static/admin.html</p>",
-            status_code=404
-        )
-    
-    with open(html_path, "r", encoding="utf-8") as f:
-        return HTMLResponse(content=f.read())
+    return _html_response(
+        request,
+        "static/admin.html",
+        "<h1>Admin Dashboard not found</h1><p>Please create static/admin.html</p>"
+    )
@@ -0,0 +1,92 @@
+"""
+Shared response classes for API routers
+"""
+from functools import lru_cache
+from typing import Any, Callable
+
+import orjson
+from fastapi import Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson
+
+    orjson encodes dicts/lists/floats in native code and returns bytes
+    directly, which is noticeably cheaper than the stdlib encoder for the
+    larger payloads (/api/leaderboard-data, /config).
+
+    OPT_NON_STR_KEYS keeps integer question ids usable as dict keys
+    (e.g. the "questions" map in /config), matching stdlib json behaviour.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def etag_response(request: Request, etag: str, build_content: Callable[[], Any]) -> Response:
+    """
+    Return 304 when the client already holds `etag`, otherwise a JSON body
+
+    `build_content` is only called on a cache miss so unchanged polls skip
+    payload construction and serialization entirely. It may also return
+    already-encoded JSON bytes, which are sent as-is.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, must-revalidate"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    content = build_content()
+    if isinstance(content, bytes):
+        return Response(content, media_type="application/json", headers=headers)
+    return ORJSONResponse(content, headers=headers)
+
+
+@lru_cache(maxsize=64)
+def accepts_gzip(accept_encoding: str) -> bool:
+    """
+    Whether an Accept-Encoding header allows gzip
+
+    An explicit gzip entry decides; otherwise "*" does. Either counts only
+    with q > 0, so "gzip;q=0" (or "*;q=0" without gzip) means identity.
+    Browsers repeat the same few header values, hence the cache.
+    """
+    gzip_q = star_q = None
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        coding = coding.strip().lower()
+        if coding not in ("gzip", "*"):
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding == "gzip":
+            gzip_q = q
+        else:
+            star_q = q
+    q = gzip_q if gzip_q is not None else star_q
+    return q is not None and q > 0
+
+
+class GZipNegotiationMiddleware(GZipMiddleware):
+    """
+    GZipMiddleware that honours Accept-Encoding q-values
+
+    The base class compresses whenever "gzip" appears anywhere in the
+    header, including "gzip;q=0". When accepts_gzip says no, the header is
+    dropped from the scope so the base class takes its identity path.
+    """
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and not accepts_gzip(Headers(scope=scope).get("accept-encoding", "")):
+            scope = dict(scope, headers=[(k, v) for k, v in scope["headers"] if k != b"accept-encoding"])
+        await super().__call__(scope, receive, send)
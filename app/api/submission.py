@@ -1,27 +1,140 @@
 """
 Submission endpoint for team answers
 """
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from typing import Callable, Dict, Optional, Tuple
 import logging
+import orjson
 
 from app import state
-from app.core.normalizer import normalize_kis, normalize_qa, normalize_tr
+from app.api.responses import ORJSONResponse, etag_response
 from app.core.scoring import score_submission
 from app.core.session import (
-    is_question_active, get_elapsed_time, get_remaining_time,
-    get_team_submission, record_submission, get_question_session,
-    get_current_active_question_id
+    session_is_accepting, session_elapsed, session_remaining,
+    record_submission, get_question_session,
+    get_current_active_question_id, get_team_lock
+)
+from app.models import (
+    GroundTruth, NormalizedSubmission, QuestionSession, ScoreResult, ScoringParams, SubmitRequest
 )
-from app.models import TeamSubmission
 from app.services.team_registry import get_team_by_session
 
 
 router = APIRouter(tags=["submission"])
 logger = logging.getLogger(__name__)
 
+# Upper bound for a /submit body; real submissions are a few hundred bytes
+MAX_SUBMIT_BODY_BYTES = 64 * 1024
+
+
+def _normalize(
+    body: Dict,
+    normalizer: Optional[Callable[[Dict, int], NormalizedSubmission]],
+    gt: GroundTruth,
+    question_id: int
+) -> NormalizedSubmission:
+    """Run the session's normalizer for the question type (400 on bad input)"""
+    if normalizer is None:
+        raise HTTPException(status_code=400, detail=f"Unknown task type: {gt.type}")
+    
+    try:
+        normalized = normalizer(body, question_id)
+    except ValueError as e:
+        logger.error("❌ Normalization error for Q%s (%s): %s", question_id, gt.type, e)
+        raise HTTPException(status_code=400, detail=f"Invalid submission format: {str(e)}")
+    except Exception as e:
+        logger.error(
+            "❌ Unexpected error normalizing Q%s (%s): %s: %s",
+            question_id, gt.type, type(e).__name__, e
+        )
+        raise HTTPException(status_code=400, detail=f"Error processing submission: {str(e)}")
+    
+    return normalized
+
+
+def _normalize_and_score(
+    body: Dict,
+    normalizer: Optional[Callable[[Dict, int], NormalizedSubmission]],
+    gt: GroundTruth,
+    question_id: int,
+    elapsed_time: float,
+    k: int,
+    params: ScoringParams
+) -> ScoreResult:
+    """CPU-bound part of /submit; runs in the threadpool and touches no session state"""
+    normalized = _normalize(body, normalizer, gt, question_id)
+    return score_submission(normalized, gt, elapsed_time, k, params)
+
+
+async def _read_capped_body(request: Request) -> bytes:
+    """
+    Read the request body, failing with 413 once it exceeds MAX_SUBMIT_BODY_BYTES
+    
+    Covers bodies without (or with an understated) Content-Length: the stream
+    is counted as it arrives, so an oversized upload is never buffered whole.
+    """
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > MAX_SUBMIT_BODY_BYTES:
+            raise HTTPException(status_code=413, detail="Request body too large")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def get_active_gt() -> Tuple[int, QuestionSession, GroundTruth]:
+    """
+    Dependency for /submit: resolve the active question before the body is read
+    
+    Rejects submissions when no question is running, the window (incl. buffer)
+    has closed, or the ground truth is missing, so those requests never pay for
+    body decoding, validation or the team lookup.
+    
+    Returns:
+        (question_id, session, ground_truth)
+    """
+    # SERVER AUTO-HANDLES: question_id from active session
+    question_id = get_current_active_question_id()
+    if not question_id:
+        raise HTTPException(
+            status_code=400, 
+            detail="No active question. Admin must start a question first."
+        )
+    
+    session = get_question_session(question_id)
+    if not session:
+        raise HTTPException(status_code=404, detail=f"Question {question_id} session not found")
+    
+    # Check if question is active (includes buffer time check)
+    if not session_is_accepting(session):
+        elapsed = session_elapsed(session)
+        raise HTTPException(
+            status_code=400,
+            detail={
+                "error": "time_limit_exceeded",
+                "elapsed_time": round(elapsed, 2),
+                "time_limit": session.time_limit,
+                "buffer_time": session.buffer_time,
+                "message": "Time limit exceeded (including buffer)"
+            }
+        )
+    
+    # Ground truth was resolved once by start_question
+    gt = session.ground_truth
+    if not gt:
+        raise HTTPException(status_code=404, detail=f"Question {question_id} not found")
+    
+    return question_id, session, gt
+
 
 @router.post("/submit")
-async def submit_answer(request: Request):
+async def submit_answer(
+    request: Request,
+    active: Tuple[int, QuestionSession, GroundTruth] = Depends(get_active_gt)
+):
     """
     Submit answer (Competition Mode - Auto team_id and question_id)
     
@@ -47,21 +160,41 @@ async def submit_answer(request: Request):
             "detail": {...}
         }
     """
+    question_id, session, gt = active
     body = None
     try:
-        # Parse request body
-        body = await request.json()
+        # Reject oversized payloads from the header before reading anything
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > MAX_SUBMIT_BODY_BYTES:
+            raise HTTPException(status_code=413, detail="Request body too large")
+        
+        # Parse request body (orjson decodes straight from the raw bytes)
+        raw_body = await _read_capped_body(request)
+        try:
+            body = orjson.loads(raw_body)
+        except orjson.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
         
-        # Log incoming request
+        # Log incoming request (full body only at DEBUG)
         client_ip = request.client.host if request.client else "unknown"
-        logger.info(f"📥 Submission from {client_ip} | Body: {body}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("📥 Submission from %s | Body: %s", client_ip, body)
+        else:
+            logger.info("📥 Submission from %s", client_ip)
         
-        answer_sets = body.get("answerSets")
+        # Validate the envelope with pydantic-core; keep 400s for bad bodies
+        try:
+            payload = SubmitRequest.model_validate(body)
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=400,
+                detail=e.errors(include_url=False, include_context=False, include_input=False)
+            )
         
-        if not answer_sets:
+        if not payload.answerSets:
             raise HTTPException(status_code=400, detail="answerSets required")
         
-        team_session_id = body.get("teamSessionId") or body.get("team_session_id")
+        team_session_id = payload.team_session_id
         if not team_session_id:
             raise HTTPException(status_code=400, detail="teamSessionId is required")
 
@@ -69,152 +202,85 @@ async def submit_answer(request: Request):
         if not team_info:
             raise HTTPException(status_code=404, detail="Invalid teamSessionId")
         team_id = team_info["team_id"]
-        team_name = team_info["team_name"]
-        
-        # SERVER AUTO-HANDLES: question_id from active session
-        question_id = get_current_active_question_id()
         
-        if not question_id:
-            raise HTTPException(
-                status_code=400, 
-                detail="No active question. Admin must start a question first."
-            )
-        
-        session = get_question_session(question_id)
-        if not session:
-            raise HTTPException(status_code=404, detail=f"Question {question_id} session not found")
-        
-        # Check if question is active (includes buffer time check)
-        if not is_question_active(question_id):
-            elapsed = get_elapsed_time(question_id)
-            raise HTTPException(
-                status_code=400,
-                detail={
-                    "error": "time_limit_exceeded",
-                    "elapsed_time": round(elapsed, 2),
-                    "time_limit": session.time_limit if session else 300,
-                    "buffer_time": session.buffer_time if session else 10,
-                    "message": "Time limit exceeded (including buffer)"
+        # check → score → record must not interleave for the same team;
+        # other teams proceed in parallel (see get_team_lock)
+        async with get_team_lock(question_id, team_id):
+            # Check if team already completed this question (every registered
+            # team has a row, see start_question / add_team_to_active_sessions)
+            team_sub = session.team_submissions[team_id]
+            if team_sub.is_completed:
+                return {
+                    "success": False,
+                    "error": "already_completed",
+                    "detail": {
+                        "score": team_sub.final_score,
+                        "completed_at": round(team_sub.first_correct_time - session.start_time, 2) if team_sub.first_correct_time else None
+                    },
+                    "message": f"You already completed this question with score {team_sub.final_score}"
                 }
+            
+            # Get elapsed time and wrong count
+            elapsed_time = session_elapsed(session)
+            k = team_sub.wrong_count
+            
+            # Scoring params for this session (built once in start_question)
+            params = session.scoring_params
+            
+            # Normalize + score off the event loop; state updates stay on it
+            result = await run_in_threadpool(
+                _normalize_and_score, body, session.normalizer, gt, question_id, elapsed_time, k, params
             )
-        
-        # Check if team already completed this question
-        team_sub = get_team_submission(question_id, team_id)
-        if team_sub and team_sub.is_completed:
-            return {
-                "success": False,
-                "error": "already_completed",
-                "detail": {
-                    "score": team_sub.final_score,
-                    "completed_at": round(team_sub.first_correct_time - session.start_time, 2) if team_sub.first_correct_time else None
-                },
-                "message": f"You already completed this question with score {team_sub.final_score}"
-            }
-        
-        session = get_question_session(question_id)
-        if not session:
-            raise HTTPException(status_code=404, detail="Question session not found")
-        if team_sub is None:
-            session.team_submissions[team_id] = TeamSubmission(
-                team_id=team_id,
-                team_name=team_name,
-                team_session_id=team_session_id,
-                question_id=question_id
+            
+            # Determine if correct
+            is_correct = result.correctness_factor > 0
+            
+            # Record submission
+            record_submission(
+                question_id,
+                team_id,
+                is_correct,
+                result.score if is_correct else None
             )
-            team_sub = session.team_submissions[team_id]
-
-        # Get ground truth from state
-        gt = state.GT_TABLE.get(question_id) if state.GT_TABLE else None
-        if not gt:
-            raise HTTPException(status_code=404, detail=f"Question {question_id} not found")
-        
-        # Normalize submission
-        try:
-            if gt.type == "KIS":
-                normalized = normalize_kis(body, question_id)
-            elif gt.type == "QA":
-                normalized = normalize_qa(body, question_id)
-            elif gt.type == "TR":
-                normalized = normalize_tr(body, question_id)
-            else:
-                raise HTTPException(status_code=400, detail=f"Unknown task type: {gt.type}")
-        except ValueError as e:
-            logger.error(f"❌ Normalization error for Q{question_id} ({gt.type}): {str(e)}")
-            raise HTTPException(status_code=400, detail=f"Invalid submission format: {str(e)}")
-        except Exception as e:
-            logger.error(f"❌ Unexpected error normalizing Q{question_id} ({gt.type}): {type(e).__name__}: {str(e)}")
-            raise HTTPException(status_code=400, detail=f"Error processing submission: {str(e)}")
-        
-        # Get elapsed time and wrong count
-        elapsed_time = get_elapsed_time(question_id)
-        k = team_sub.wrong_count if team_sub else 0
-        
-        # Load scoring params
-        base_params = state.SCORING_PARAMS
-        params = base_params.copy(
-            update={
-                "time_limit": session.time_limit,
-                "buffer_time": session.buffer_time
-            }
-        )
         
-        # Score submission
-        result = score_submission(normalized, gt, elapsed_time, k, params)
-        
-        # Determine if correct
-        is_correct = result["correctness_factor"] > 0
-        
-        # Record submission
-        record_submission(
-            question_id,
-            team_id,
-            is_correct,
-            result["score"] if is_correct else None,
-            team_name=team_name,
-            team_session_id=team_session_id
-        )
-        
-        # Build response
+        # Build response: shared detail fields first, then per-outcome ones
+        detail = {
+            "matched_events": result.matched_events,
+            "total_events": result.total_events,
+            "percentage": result.percentage,
+            "elapsed_time": round(elapsed_time, 2)
+        }
         if is_correct:
-            correctness = "full" if result["correctness_factor"] == 1.0 else "partial"
+            correctness = "full" if result.correctness_factor == 1.0 else "partial"
             logger.info(
-                f"✅ Team {team_id} | Q{question_id} ({gt.type}) | "
-                f"Score: {result['score']:.2f} | Time: {elapsed_time:.2f}s | Wrong: {k}"
+                "✅ Team %s | Q%s (%s) | Score: %.2f | Time: %.2fs | Wrong: %s",
+                team_id, question_id, gt.type, result.score, elapsed_time, k
             )
-            return {
+            detail["time_factor"] = result.time_factor
+            detail["penalty"] = result.penalty
+            detail["wrong_count"] = k
+            # Returned as a ready response so FastAPI skips the jsonable_encoder walk
+            return ORJSONResponse({
                 "success": True,
                 "correctness": correctness,
-                "score": result["score"],
-                "detail": {
-                    "matched_events": result["matched_events"],
-                    "total_events": result["total_events"],
-                    "percentage": result["percentage"],
-                    "elapsed_time": round(elapsed_time, 2),
-                    "time_factor": result["time_factor"],
-                    "penalty": result["penalty"],
-                    "wrong_count": k
-                },
-                "message": f"Correct! Final score: {result['score']}"
-            }
+                "score": result.score,
+                "detail": detail,
+                "message": f"Correct! Final score: {result.score}"
+            })
         else:
             logger.info(
-                f"❌ Team {team_id} | Q{question_id} ({gt.type}) | "
-                f"Incorrect | Matched: {result['matched_events']}/{result['total_events']} | Wrong: {k+1}"
+                "❌ Team %s | Q%s (%s) | Incorrect | Matched: %s/%s | Wrong: %s",
+                team_id, question_id, gt.type, result.matched_events, result.total_events, k + 1
             )
-            return {
+            detail["remaining_time"] = round(session_remaining(session), 2)
+            detail["wrong_count"] = k + 1
+            return ORJSONResponse({
                 "success": False,
                 "correctness": "incorrect",
                 "score": 0,
-                "detail": {
-                    "matched_events": result["matched_events"],
-                    "total_events": result["total_events"],
-                    "percentage": result["percentage"],
-                    "elapsed_time": round(elapsed_time, 2),
-                    "remaining_time": round(get_remaining_time(question_id), 2),
-                    "wrong_count": k + 1
-                },
+                "detail": detail,
                 "message": "Incorrect. Try again!"
-            }
+            })
         
     except HTTPException:
         raise
@@ -222,29 +288,36 @@ async def submit_answer(request: Request):
         # Log detailed error with request body
         client_ip = request.client.host if request.client else "unknown"
         logger.error(
-            f"❌ ERROR in /submit from {client_ip}\n"
-            f"Request Body: {body}\n"
-            f"Error: {str(e)}\n"
-            f"Error Type: {type(e).__name__}",
+            "❌ ERROR in /submit from %s\nRequest Body: %s\nError: %s\nError Type: %s",
+            client_ip, body, e, type(e).__name__,
             exc_info=True
         )
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
-@router.get("/questions")
-async def list_questions():
-    """List all available questions"""
-    if not state.GT_TABLE:
-        return {"questions": []}
-    
+def rebuild_questions_cache() -> bytes:
+    """Encode the /questions body once from GT_TABLE (fixed after startup)"""
     questions = []
-    for qid, gt in sorted(state.GT_TABLE.items()):
+    for qid in state.GT_QUESTION_IDS:
+        gt = state.GT_TABLE[qid]
         questions.append({
             "id": qid,
             "type": gt.type,
             "video_id": gt.video_id,
             "scene_id": gt.scene_id,
-            "num_events": len(gt.points) // 2
+            "num_events": gt.num_events
         })
     
-    return {"questions": questions}
+    state.QUESTIONS_BODY = orjson.dumps({"questions": questions})
+    return state.QUESTIONS_BODY
+
+
+@router.get("/questions")
+async def list_questions(request: Request):
+    """List all available questions"""
+    if not state.GT_TABLE:
+        return {"questions": []}
+    
+    if not state.QUESTIONS_BODY:
+        rebuild_questions_cache()
+    return etag_response(request, f'W/"questions-{state.CONFIG_VERSION}"', lambda: state.QUESTIONS_BODY)
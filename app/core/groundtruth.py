@@ -3,9 +3,11 @@ Ground truth loader from CSV
 """
 import csv
 import logging
+import sys
 from pathlib import Path
 from typing import Dict
 
+from app.core.scoring import event_geometry
 from app.models import GroundTruth
 
 
@@ -26,7 +28,7 @@ def load_groundtruth(csv_path: str) -> Dict[int, GroundTruth]:
         csv_path: Path to CSV file
         
     Returns:
-        Dictionary mapping question ID to GroundTruth
+        Dictionary mapping question ID to GroundTruth, in ascending ID order
         
     Raises:
         FileNotFoundError: If CSV file not found
@@ -40,21 +42,30 @@ def load_groundtruth(csv_path: str) -> Dict[int, GroundTruth]:
     gt_table = {}
     
     with open(path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
+        reader = csv.reader(f)
+        header = next(reader, [])
+        col = {name.strip(): i for i, name in enumerate(header)}
+        id_i, type_i, scene_i, video_i, points_i = (
+            col['id'], col['type'], col['scene_id'], col['video_id'], col['points']
+        )
+        answer_i = col.get('answer')
         
         for row in reader:
-            qid = int(row['id'])
-            qtype = row['type'].strip().upper()
-            scene_id = row['scene_id'].strip()
-            video_id = row['video_id'].strip()
+            if not row:
+                continue
+            qid = int(row[id_i])
+            # Interned so it is the same object as the "KIS"/"QA"/"TR" literals used
+            # for dispatch; str == then succeeds on the identity check
+            qtype = sys.intern(row[type_i].strip().upper())
+            scene_id = row[scene_i].strip()
+            video_id = row[video_i].strip()
             
             # Parse points - comma-separated (filter only digits)
-            points_str = row['points'].strip().strip('"')  # Remove quotes if present
+            points_str = row[points_i].strip().strip('"')  # Remove quotes if present
             
             # Split and filter: only keep parts that are pure numbers
-            parts = [p.strip() for p in points_str.split(',')]
             points = []
-            for p in parts:
+            for p in points_str.split(','):
                 # Try to convert to int, skip if not a number (e.g., "Mộc Châu")
                 try:
                     points.append(int(p))
@@ -67,16 +78,16 @@ def load_groundtruth(csv_path: str) -> Dict[int, GroundTruth]:
                     f"Question {qid}: points count must be even, got {len(points)}"
                 )
             
-            # Validate points are sorted
-            if points != sorted(points):
+            # Validate points are sorted (short-circuits, no sorted copy)
+            if not all(a <= b for a, b in zip(points, points[1:])):
                 raise ValueError(
                     f"Question {qid}: points must be sorted in ascending order"
                 )
             
             # Parse answer for QA (optional)
             answer = None
-            if 'answer' in row and row['answer']:
-                answer = row['answer'].strip()
+            if answer_i is not None and answer_i < len(row) and row[answer_i]:
+                answer = row[answer_i].strip()
             
             gt = GroundTruth(
                 stt=qid,
@@ -87,6 +98,7 @@ def load_groundtruth(csv_path: str) -> Dict[int, GroundTruth]:
                 answer=answer
             )
             
+            event_geometry(gt)  # Prewarm the scoring arrays
             gt_table[qid] = gt
     
     if not gt_table:
@@ -94,4 +106,5 @@ def load_groundtruth(csv_path: str) -> Dict[int, GroundTruth]:
     
     logger.info("Loaded %s ground truth entries from %s", len(gt_table), csv_path)
     
-    return gt_table
+    # Ascending question ID order, so callers can iterate without sorting
+    return dict(sorted(gt_table.items()))
@@ -1,11 +1,64 @@
 """
 Normalizer for different task types (KIS, QA, TR)
 """
-import re
-from typing import Dict
+from typing import Callable, Dict, Optional, Tuple
 from app.models import NormalizedSubmission
 
 
+def _split_media(media: str) -> Optional[Tuple[str, str]]:
+    """Split <SCENE_ID>_<VIDEO_ID> (ASCII alphanumeric parts), None if malformed"""
+    parts = media.split('_')
+    if len(parts) != 2:
+        return None
+    scene_id, video_id = parts
+    if not (scene_id.isascii() and scene_id.isalnum() and video_id.isascii() and video_id.isalnum()):
+        return None
+    return scene_id, video_id
+
+
+def _parse_qa_text(text: str) -> Optional[Tuple[str, str, str, str]]:
+    """
+    Split QA-<ANSWER>-<SCENE_ID>_<VIDEO_ID>-<TIME(s)> into its four parts
+
+    Both the answer and the times may contain '-', so (like the greedy regex
+    this replaced) the media field is the right-most '-'-separated part shaped
+    <SCENE_ID>_<VIDEO_ID> with a non-empty answer before it and non-blank
+    times after it. Returns None if malformed.
+    """
+    parts = text.split('-')
+    if len(parts) < 4 or parts[0] != "QA":
+        return None
+    for i in range(len(parts) - 2, 1, -1):
+        media_ids = _split_media(parts[i])
+        if media_ids is None:
+            continue
+        ans_text = '-'.join(parts[1:i])
+        times_str = '-'.join(parts[i + 1:])
+        if ans_text and times_str and not times_str.isspace():
+            return ans_text, media_ids[0], media_ids[1], times_str
+    return None
+
+
+def _parse_tr_text(text: str) -> Optional[Tuple[str, str, str]]:
+    """Split TR-<SCENE_ID>_<VIDEO_ID>-<FRAME_IDS> into its parts (None if malformed)"""
+    parts = text.split('-', 2)
+    if len(parts) != 3 or parts[0] != "TR" or not parts[2] or parts[2].isspace():
+        return None
+    media_ids = _split_media(parts[1])
+    if media_ids is None:
+        return None
+    return media_ids[0], media_ids[1], parts[2]
+
+
+def _kis_to_int(value) -> int:
+    """KIS start/end as int ms; float() already tolerates surrounding whitespace"""
+    if value is None or value == "":
+        raise ValueError("Missing start/end value in KIS answer")
+    if isinstance(value, (int, float)):
+        return int(value)
+    return int(float(value))
+
+
 def normalize_kis(body: Dict, question_id: int) -> NormalizedSubmission:
     """
     Normalize KIS submission
@@ -46,29 +99,19 @@ def normalize_kis(body: Dict, question_id: int) -> NormalizedSubmission:
     scene_id = None
     video_id = None
     
-    def _to_int(value) -> int:
-        if value is None or value == "":
-            raise ValueError("Missing start/end value in KIS answer")
-        if isinstance(value, (int, float)):
-            return int(value)
-        return int(float(str(value).strip()))
-    
     for answer in answers:
         # Get scene_id and video_id from first answer
         if scene_id is None or video_id is None:
             media_item = answer.get("mediaItemName", "").strip()
             
-            # Parse format: SCENE_ID_VIDEO_ID
-            if '_' not in media_item:
+            # Parse format: SCENE_ID_VIDEO_ID (split only on first underscore)
+            scene_id, sep, video_id = media_item.partition('_')
+            if not sep:
                 raise ValueError(f"Invalid mediaItemName format. Expected: <SCENE_ID>_<VIDEO_ID>, got: {media_item}")
-            
-            parts = media_item.split('_', 1)  # Split only on first underscore
-            scene_id = parts[0]
-            video_id = parts[1]
         
         # Capture start/end milliseconds for each event
-        start_val = _to_int(answer.get("start"))
-        end_val = _to_int(answer.get("end", start_val))
+        start_val = _kis_to_int(answer.get("start"))
+        end_val = _kis_to_int(answer.get("end", start_val))
         values.extend([start_val, end_val])
     
     if not scene_id or not video_id:
@@ -79,7 +122,7 @@ def normalize_kis(body: Dict, question_id: int) -> NormalizedSubmission:
         qtype="KIS",
         scene_id=scene_id,
         video_id=video_id,
-        values=values
+        values=list(dict.fromkeys(values))  # start == end (or repeated answers) count once, order kept
     )
 
 
@@ -130,21 +173,15 @@ def normalize_qa(body: Dict, question_id: int) -> NormalizedSubmission:
     video_id = None
     answer_text = None
     
-    # Pattern: QA-<ANSWER>-<SCENE_ID>_<VIDEO_ID>-<TIME(s)>
-    # Answer can be any text, times can be comma-separated
-    pattern = r"^QA-(.+)-([A-Za-z0-9]+)_([A-Za-z0-9]+)-(.+)$"
-    
     for answer in answers:
-        text = answer.get("text", "").strip()
+        text = answer.get("text", "")
         
-        match = re.match(pattern, text)
-        if not match:
-            raise ValueError(f"Invalid QA answer format. Expected: QA-<ANSWER>-<SCENE_ID>_<VIDEO_ID>-<MS>, got: {text}")
+        # Parse as sent; only strip and retry when that fails (e.g. leading spaces)
+        parsed = _parse_qa_text(text) or _parse_qa_text(text.strip())
+        if parsed is None:
+            raise ValueError(f"Invalid QA answer format. Expected: QA-<ANSWER>-<SCENE_ID>_<VIDEO_ID>-<MS>, got: {text.strip()}")
         
-        ans_text = match.group(1)  # The answer part - NO NORMALIZATION, keep as-is
-        sid = match.group(2)
-        vid = match.group(3)
-        times_str = match.group(4)
+        ans_text, sid, vid, times_str = parsed  # ans_text is kept as-is - NO NORMALIZATION
         
         # Store first answer text (as-is, no modification)
         if answer_text is None:
@@ -161,9 +198,10 @@ def normalize_qa(body: Dict, question_id: int) -> NormalizedSubmission:
         elif video_id != vid:
             raise ValueError(f"Video ID mismatch: {video_id} vs {vid}")
         
-        # Parse times (can be comma-separated)
-        times = [int(t.strip()) for t in times_str.split(',') if t.strip()]
-        values.extend(times)
+        # Parse times (can be comma-separated); parts are stripped before int()
+        # so a bad time is reported without the surrounding whitespace, and
+        # blank parts (e.g. a trailing comma) are dropped
+        values.extend(map(int, filter(None, map(str.strip, times_str.split(',')))))
     
     if not scene_id or not video_id:
         raise ValueError("No scene_id or video_id found in QA answers")
@@ -173,7 +211,7 @@ def normalize_qa(body: Dict, question_id: int) -> NormalizedSubmission:
         qtype="QA",
         scene_id=scene_id,
         video_id=video_id,
-        values=values,
+        values=list(dict.fromkeys(values)),  # Repeated times count once, order kept
         answer=answer_text
     )
 
@@ -208,22 +246,17 @@ def normalize_tr(body: Dict, question_id: int) -> NormalizedSubmission:
     if len(answers) > 1:
         raise ValueError("TR/TRAKE should have exactly 1 answer with comma-separated frame IDs")
     
-    text = answers[0].get("text", "").strip()
-    
-    # Pattern: TR-<SCENE_ID>_<VIDEO_ID>-<FRAME_IDS>
-    # Frame IDs are comma-separated
-    pattern = r"TR-([A-Za-z0-9]+)_([A-Za-z0-9]+)-(.+)"
+    text = answers[0].get("text", "")
     
-    match = re.match(pattern, text)
-    if not match:
-        raise ValueError(f"Invalid TR answer format. Expected: TR-<SCENE_ID>_<VIDEO_ID>-<FRAME_IDS>, got: {text}")
+    # Parse as sent; only strip and retry when that fails (e.g. leading spaces)
+    parsed = _parse_tr_text(text) or _parse_tr_text(text.strip())
+    if parsed is None:
+        raise ValueError(f"Invalid TR answer format. Expected: TR-<SCENE_ID>_<VIDEO_ID>-<FRAME_IDS>, got: {text.strip()}")
     
-    scene_id = match.group(1)
-    video_id = match.group(2)
-    frame_ids_str = match.group(3)
+    scene_id, video_id, frame_ids_str = parsed
     
-    # Parse frame IDs (comma-separated)
-    values = [int(f.strip()) for f in frame_ids_str.split(',') if f.strip()]
+    # Parse frame IDs (comma-separated); repeats are dropped, order kept
+    values = list(dict.fromkeys(map(int, filter(None, map(str.strip, frame_ids_str.split(','))))))
     
     if not values:
         raise ValueError("No frame IDs found in TR answer")
@@ -235,3 +268,11 @@ def normalize_tr(body: Dict, question_id: int) -> NormalizedSubmission:
         video_id=video_id,
         values=values
     )
+
+
+# Normalizer per task type, so callers dispatch with one dict lookup
+NORMALIZERS: Dict[str, Callable[[Dict, int], NormalizedSubmission]] = {
+    "KIS": normalize_kis,
+    "QA": normalize_qa,
+    "TR": normalize_tr,
+}
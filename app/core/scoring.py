@@ -12,8 +12,11 @@ Rules:
   - KIS/QA: Only score if all events matched
   - TRAKE: 100% → factor 1.0, 50-99% → factor 0.5, <50% → factor 0.0
 """
-from typing import List, Tuple, Dict
-from app.models import GroundTruth, NormalizedSubmission, ScoringParams
+from typing import List, Tuple, Optional
+
+import numpy as np
+
+from app.models import GroundTruth, NormalizedSubmission, ScoreResult, ScoringParams
 from app.utils import points_to_events
 
 
@@ -75,24 +78,18 @@ def calculate_match_score(user_val: int, gt_start: int, gt_end: int, tolerance:
     Returns:
         Score factor in range [0.0, 1.0]
     """
-    # Calculate event center
-    center = (gt_start + gt_end) / 2.0
-    
-    # Calculate distance from center
-    distance = abs(user_val - center)
-    
-    # Calculate maximum allowed distance (half range + tolerance)
-    half_range = (gt_end - gt_start) / 2.0
-    max_distance = half_range + tolerance
+    # Work in doubled units so the bound check stays in integers:
+    # 2 * distance = |2 * user_val - (start + end)|
+    # 2 * max_dist = (end - start) + 2 * tolerance
+    distance2 = abs(2 * user_val - (gt_start + gt_end))
+    max_distance2 = (gt_end - gt_start) + 2 * tolerance
     
     # Check if outside tolerance
-    if distance > max_distance:
+    if distance2 > max_distance2:
         return 0.0
     
     # Linear decay: 100% at center, 50% at tolerance boundary
-    score_factor = 1.0 - 0.5 * (distance / max_distance)
-    
-    return score_factor
+    return 1.0 - 0.5 * (distance2 / max_distance2)
 
 
 def check_match_with_tolerance(
@@ -104,8 +101,11 @@ def check_match_with_tolerance(
     Check match with tolerance and calculate weighted correctness
     
     Logic:
-    - For each user value, find best matching event (highest score)
-    - Each event can only be matched once (greedy matching)
+    - Score every (user value, event) pair in one NumPy pass
+    - Repeated values count once (a single timestamp is one candidate)
+    - Each value and each event can be used at most once; pairs are chosen by
+      optimal assignment (most matched events first, then best total quality),
+      so a value close to two events never "steals" the only option of another
     - Calculate average match quality across all events
     
     Args:
@@ -116,42 +116,129 @@ def check_match_with_tolerance(
     Returns:
         (matched_events, total_events, average_match_quality)
     """
-    total_events = len(gt_events)
-    if total_events == 0:
+    if not gt_events:
         return 0, 0, 0.0
     
-    # Track which events have been matched
-    event_scores = {}  # event_idx -> best_score
-    
-    for user_val in user_values:
-        best_event_idx = -1
-        best_score = 0.0
-        
-        # Find best matching event for this user value
-        for idx, (gt_start, gt_end) in enumerate(gt_events):
-            score = calculate_match_score(user_val, gt_start, gt_end, tolerance)
-            
-            if score > 0 and score > best_score:
-                best_event_idx = idx
-                best_score = score
-        
-        # Record the best match (if any)
-        if best_event_idx >= 0:
-            # Keep the best score for this event
-            if best_event_idx not in event_scores or best_score > event_scores[best_event_idx]:
-                event_scores[best_event_idx] = best_score
-    
-    matched_events = len(event_scores)
+    bounds = np.asarray(gt_events, dtype=np.float64)
+    centers = (bounds[:, 0] + bounds[:, 1]) / 2.0
+    max_dist = (bounds[:, 1] - bounds[:, 0]) / 2.0 + tolerance
+    return _match_events(user_values, centers, max_dist)
+
+
+def _match_events(
+    user_values: List[int],
+    centers: np.ndarray,
+    max_dist: np.ndarray
+) -> Tuple[int, int, float]:
+    """check_match_with_tolerance on precomputed event centers / max distances"""
+    total_events = len(centers)
+    if total_events == 0:
+        return 0, 0, 0.0
+    if not user_values:
+        return 0, total_events, 0.0
+    
+    # Repeated values are one candidate (a KIS answer with start == end must
+    # not cover two events); np.unique also sorts them for the binary search
+    # of each event's [center - max_dist, center + max_dist] window, after
+    # which values that fall in no window at all are dropped
+    user = np.unique(np.asarray(user_values, dtype=np.float64))
+    lo = np.searchsorted(user, centers - max_dist, "left")
+    hi = np.searchsorted(user, centers + max_dist, "right")
+    coverage = np.zeros(len(user) + 1, dtype=np.int64)
+    np.add.at(coverage, lo, 1)
+    np.add.at(coverage, hi, -1)
+    user = user[np.cumsum(coverage[:-1]) > 0]
+    if not len(user):
+        return 0, total_events, 0.0
+    
+    # Score every remaining (user value, event) pair at once, same formula as
+    # calculate_match_score: shape [U, E]
+    dist = np.abs(user[:, None] - centers[None, :])
+    scores = np.where(dist <= max_dist, 1.0 - 0.5 * (dist / max_dist), 0.0)
+    
+    # Only values/events with at least one in-tolerance pair take part
+    rows = np.flatnonzero(scores.max(axis=1) > 0)
+    cols = np.flatnonzero(scores.max(axis=0) > 0)
+    event_scores = np.zeros(total_events)
+    if len(rows):
+        hits = scores[np.ix_(rows, cols)]
+        # Any extra match outweighs every possible quality difference
+        weights = np.where(hits > 0, hits + (total_events + 1), 0.0)
+        for r, c in _max_weight_assignment(weights.tolist()):
+            event_scores[cols[c]] = hits[r, c]
+    
+    matched_events = int(np.count_nonzero(event_scores))
     
     # Calculate average match quality
     if matched_events > 0:
-        avg_quality = sum(event_scores.values()) / total_events
+        avg_quality = float(event_scores.sum()) / total_events
     else:
         avg_quality = 0.0
     
     return matched_events, total_events, avg_quality
 
 
+def _max_weight_assignment(weights: List[List[float]]) -> List[Tuple[int, int]]:
+    """
+    Maximum-weight one-to-one assignment (Hungarian algorithm, O(n²·m))
+    
+    Args:
+        weights: Non-negative weight matrix [rows][cols]
+    
+    Returns:
+        (row, col) pairs with positive weight in the optimal assignment
+    """
+    n, m = len(weights), len(weights[0])
+    if n > m:
+        return [(r, c) for c, r in _max_weight_assignment([list(col) for col in zip(*weights)])]
+    
+    # Classic potentials formulation on costs = -weights, 1-indexed
+    inf = float("inf")
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    owner = [0] * (m + 1)   # owner[j] = row assigned to column j
+    way = [0] * (m + 1)
+    for i in range(1, n + 1):
+        owner[0] = i
+        j0 = 0
+        min_v = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0 = owner[j0]
+            row = weights[i0 - 1]
+            delta = inf
+            j1 = 0
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = -row[j - 1] - u[i0] - v[j]
+                    if cur < min_v[j]:
+                        min_v[j] = cur
+                        way[j] = j0
+                    if min_v[j] < delta:
+                        delta = min_v[j]
+                        j1 = j
+            for j in range(m + 1):
+                if used[j]:
+                    u[owner[j]] += delta
+                    v[j] -= delta
+                else:
+                    min_v[j] -= delta
+            j0 = j1
+            if owner[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            owner[j0] = owner[j1]
+            j0 = j1
+    
+    return [
+        (owner[j] - 1, j - 1)
+        for j in range(1, m + 1)
+        if owner[j] and weights[owner[j] - 1][j - 1] > 0
+    ]
+
+
 def calculate_correctness_factor(
     matched: int, 
     total: int, 
@@ -181,24 +268,23 @@ def calculate_correctness_factor(
     if total == 0:
         return 0.0
     
-    percentage = (matched / total) * 100
+    # Thresholds compared on integers: 100% ⇔ matched >= total, 50% ⇔ 2·matched >= total
+    if task_type == "TR":
+        # TRAKE: Partial scoring allowed
+        if matched >= total:
+            return avg_quality  # Full match, adjusted by quality
+        elif 2 * matched >= total:
+            return avg_quality * 0.5  # Half score, adjusted by quality
+        else:
+            return 0.0  # Too few matches
     
-    if task_type in ["KIS", "QA"]:
+    if task_type == "KIS" or task_type == "QA":
         # KIS/QA: Must match all events, but quality affects score
         if matched == total:
             return avg_quality  # Full match but adjusted by quality
         else:
             return 0.0  # Missing events → no score
     
-    elif task_type == "TR":
-        # TRAKE: Partial scoring allowed
-        if percentage >= 100:
-            return avg_quality  # Full match, adjusted by quality
-        elif percentage >= 50:
-            return avg_quality * 0.5  # Half score, adjusted by quality
-        else:
-            return 0.0  # Too few matches
-    
     return 0.0
 
 
@@ -210,7 +296,7 @@ def calculate_final_score(
     k: int,
     params: ScoringParams,
     avg_quality: float = 1.0
-) -> Dict:
+) -> ScoreResult:
     """
     Calculate final score using AIC 2025 formula with quality adjustment
     
@@ -233,7 +319,7 @@ def calculate_final_score(
         avg_quality: Average match quality (0.5-1.0 from tolerance matching)
     
     Returns:
-        Dictionary with scoring details
+        ScoreResult with scoring details
     """
     # 1. Calculate time factor
     fT = calculate_time_factor(t_submit, params.time_limit)
@@ -243,7 +329,7 @@ def calculate_final_score(
     percentage = (matched / total * 100) if total > 0 else 0
     
     # 3. Calculate base score (before penalty and correctness)
-    base_score = params.p_base + (params.p_max - params.p_base) * fT
+    base_score = params.p_base + params.score_span * fT
     
     # 4. Calculate penalty
     penalty = k * params.p_penalty
@@ -252,17 +338,59 @@ def calculate_final_score(
     score_before_correctness = max(0, base_score - penalty)
     final_score = score_before_correctness * correctness_factor
     
-    return {
-        "score": round(final_score, 2),
-        "correctness_factor": round(correctness_factor, 4),
-        "match_quality": round(avg_quality, 4),
-        "time_factor": round(fT, 4),
-        "base_score": round(base_score, 2),
-        "penalty": penalty,
-        "percentage": round(percentage, 2),
-        "matched_events": matched,
-        "total_events": total
-    }
+    return ScoreResult(
+        score=round(final_score, 2),
+        correctness_factor=round(correctness_factor, 4),
+        match_quality=round(avg_quality, 4),
+        time_factor=round(fT, 4),
+        base_score=round(base_score, 2),
+        penalty=penalty,
+        percentage=round(percentage, 2),
+        matched_events=matched,
+        total_events=total
+    )
+
+
+def event_geometry(ground_truth: GroundTruth) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Event centers and max match distances for a ground truth, cached on the object
+    
+    GT entries are immutable once loaded, so the arrays are built on first use
+    (the loader prewarms them) and reused by every submission.
+    
+    Returns:
+        (centers, max_dist) arrays of shape [num_events]
+    """
+    geometry: Optional[Tuple[np.ndarray, np.ndarray]] = ground_truth._geometry
+    if geometry is None:
+        tolerance = TOLERANCE_FRAMES if ground_truth.type == "TR" else TOLERANCE_MS
+        bounds = points_to_events(ground_truth.points)
+        centers = (bounds[:, 0] + bounds[:, 1]) / 2.0
+        max_dist = (bounds[:, 1] - bounds[:, 0]) / 2.0 + tolerance
+        geometry = ground_truth._geometry = (centers, max_dist)
+    return geometry
+
+
+def _zero_result(
+    ground_truth: GroundTruth,
+    time_factor: float,
+    k: int,
+    params: ScoringParams,
+    message: str
+) -> ScoreResult:
+    """score_submission result for submissions rejected before matching (score 0)"""
+    return ScoreResult(
+        score=0.0,
+        correctness_factor=0.0,
+        match_quality=0.0,
+        time_factor=time_factor,
+        base_score=0.0,
+        penalty=k * params.p_penalty,
+        percentage=0.0,
+        matched_events=0,
+        total_events=ground_truth.num_events,
+        message=message
+    )
 
 
 def score_submission(
@@ -271,7 +399,7 @@ def score_submission(
     t_submit: float,
     k: int,
     params: ScoringParams
-) -> Dict:
+) -> ScoreResult:
     """
     Main scoring entry point with tolerance-based matching
     
@@ -283,75 +411,43 @@ def score_submission(
         params: Scoring parameters
     
     Returns:
-        Scoring result dictionary
+        ScoreResult
     """
     time_factor = calculate_time_factor(t_submit, params.time_limit)
     
     # Validate scene_id and video_id match - return 0 score if wrong
     if submission.scene_id != ground_truth.scene_id or submission.video_id != ground_truth.video_id:
-        return {
-            "score": 0,
-            "correctness_factor": 0.0,
-            "match_quality": 0.0,
-            "matched_events": 0,
-            "total_events": len(ground_truth.points) // 2,
-            "percentage": 0.0,
-            "time_factor": time_factor,
-            "elapsed_time": t_submit,
-            "wrong_attempts": k,
-            "penalty": k * params.p_penalty,
-            "message": f"Wrong video/scene. Expected: {ground_truth.scene_id}_{ground_truth.video_id}, Got: {submission.scene_id}_{submission.video_id}"
-        }
+        return _zero_result(
+            ground_truth, time_factor, k, params,
+            f"Wrong video/scene. Expected: {ground_truth.scene_id}_{ground_truth.video_id}, Got: {submission.scene_id}_{submission.video_id}"
+        )
     
     # For QA: Check answer text first (must match to continue)
     if ground_truth.type == "QA":
         if ground_truth.answer:  # If groundtruth has answer
             if not submission.answer:  # User didn't provide answer
-                return {
-                    "score": 0,
-                    "correctness_factor": 0.0,
-                    "match_quality": 0.0,
-                    "matched_events": 0,
-                    "total_events": len(ground_truth.points) // 2,
-                    "percentage": 0.0,
-                    "time_factor": time_factor,
-                    "elapsed_time": t_submit,
-                    "wrong_attempts": k,
-                    "penalty": k * params.p_penalty,
-                    "message": "QA answer text is required but not provided"
-                }
+                return _zero_result(
+                    ground_truth, time_factor, k, params,
+                    "QA answer text is required but not provided"
+                )
             
             # STRICT comparison - no normalization, exact match only
             if submission.answer != ground_truth.answer:
-                return {
-                    "score": 0,
-                    "correctness_factor": 0.0,
-                    "match_quality": 0.0,
-                    "matched_events": 0,
-                    "total_events": len(ground_truth.points) // 2,
-                    "percentage": 0.0,
-                    "time_factor": time_factor,
-                    "elapsed_time": t_submit,
-                    "wrong_attempts": k,
-                    "penalty": k * params.p_penalty,
-                    "message": f"Wrong QA answer. Expected: {ground_truth.answer}, Got: {submission.answer}"
-                }
-    
-    # Determine tolerance based on task type
-    if ground_truth.type == "TR":
-        tolerance = TOLERANCE_FRAMES  # ±12 frames
-    else:  # KIS or QA
-        tolerance = TOLERANCE_MS  # ±2500 ms (2.5 seconds)
-    
-    # Parse GT events from points
-    gt_events = points_to_events(ground_truth.points)
-    
-    # Check match with tolerance (returns match quality)
-    matched, total, avg_quality = check_match_with_tolerance(
-        submission.values, 
-        gt_events, 
-        tolerance
-    )
+                return _zero_result(
+                    ground_truth, time_factor, k, params,
+                    f"Wrong QA answer. Expected: {ground_truth.answer}, Got: {submission.answer}"
+                )
+    
+    if ground_truth.type != "TR" and len(submission.values) < ground_truth.num_events:
+        # KIS/QA only score when every event is matched, and each value can
+        # match at most one event: too few values can never score
+        matched, total, avg_quality = 0, ground_truth.num_events, 0.0
+    else:
+        # Cached event geometry (tolerance: TR ±12 frames, KIS/QA ±2500 ms)
+        centers, max_dist = event_geometry(ground_truth)
+        
+        # Check match with tolerance (returns match quality)
+        matched, total, avg_quality = _match_events(submission.values, centers, max_dist)
     
     # Calculate final score with quality adjustment
     result = calculate_final_score(
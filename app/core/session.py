@@ -3,11 +3,14 @@ Question-level session management for AIC 2025 Competition
 Server-controlled timing with per-team submission tracking
 """
 import asyncio
+import heapq
 import logging
-import random
 import time
-from typing import Dict, List, Optional
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
 
+from app import state
+from app.core.normalizer import NORMALIZERS
 from app.models import QuestionSession, TeamSubmission
 
 
@@ -19,13 +22,21 @@ active_questions: Dict[int, QuestionSession] = {}
 # Track currently active question (last started that is still active)
 current_active_question_id: Optional[int] = None
 
+# Per-(question, team) locks serializing /submit's check → score → record sequence
+_team_locks: Dict[Tuple[int, str], asyncio.Lock] = {}
+
 
 def _refresh_active_question_id() -> Optional[int]:
     """
     Ensure the cached current_active_question_id points to an active session.
+
+    Sessions only become active through start_question, which sets the id,
+    so once it has been resolved to None there is nothing to rescan.
     """
     global current_active_question_id
-    if current_active_question_id and is_question_active(current_active_question_id):
+    if current_active_question_id is None:
+        return None
+    if is_question_active(current_active_question_id):
         return current_active_question_id
     
     # Find the most recently started active session (if any)
@@ -43,6 +54,45 @@ def _refresh_active_question_id() -> Optional[int]:
     return None
 
 
+def get_team_lock(question_id: int, team_id: str) -> asyncio.Lock:
+    """
+    Return the submission lock for one team on one question (created on first use)
+    
+    Submissions from the same team run one at a time; different teams never
+    wait on each other. No await between lookup and insert, so no guard lock.
+    """
+    key = (question_id, team_id)
+    lock = _team_locks.get(key)
+    if lock is None:
+        lock = _team_locks[key] = asyncio.Lock()
+    return lock
+
+
+def _purge_team_locks(question_id: int) -> None:
+    """
+    Drop the idle submission locks of a closed question
+    
+    A lock that is still held belongs to a submit that got past the active
+    check before the stop; dropping it would let a later submit from the same
+    team take a fresh lock and interleave, so it is left for the next sweep.
+    """
+    for key in [key for key, lock in _team_locks.items() if key[0] == question_id and not lock.locked()]:
+        del _team_locks[key]
+
+
+def _purge_idle_team_locks() -> None:
+    """
+    Drop the submission locks of every question that no longer accepts submissions
+    
+    Questions that simply run out of time are never stopped, so start_question
+    sweeps their locks instead of letting them pile up. Held locks are kept
+    (see _purge_team_locks).
+    """
+    accepting = {qid for qid, session in active_questions.items() if session_is_accepting(session)}
+    for key in [key for key, lock in _team_locks.items() if key[0] not in accepting and not lock.locked()]:
+        del _team_locks[key]
+
+
 def get_current_active_question_id() -> Optional[int]:
     """Return the current active question id (if still accepting submissions)."""
     return _refresh_active_question_id()
@@ -99,6 +149,8 @@ async def schedule_fake_team_submission(
         correct_count: Number of correct submissions (0 or 1)
         score: Final score if correct
     """
+    from app.services.fake_teams import generate_attempt_gap
+    
     await asyncio.sleep(delay)
     
     # Check if question still exists
@@ -106,25 +158,19 @@ async def schedule_fake_team_submission(
     if not session:
         return
     
-    def _is_accepting_submissions() -> bool:
-        if not session.is_active:
-            return False
-        elapsed = time.time() - session.start_time
-        return elapsed <= (session.time_limit + session.buffer_time)
-    
-    if not _is_accepting_submissions():
+    if not session_is_accepting(session):
         return
     
     # Submit wrong attempts first
     for _ in range(wrong_count):
-        if not _is_accepting_submissions():
+        if not session_is_accepting(session):
             return
-        record_submission(question_id, team_name, is_correct=False, score=None, team_name=team_name)
-        await asyncio.sleep(random.uniform(1, 5))  # Small delay between attempts
+        record_submission(question_id, team_name, is_correct=False, score=None)
+        await asyncio.sleep(generate_attempt_gap())  # Small delay between attempts
     
     # Submit correct answer if still within allowed window
-    if correct_count > 0 and _is_accepting_submissions():
-        record_submission(question_id, team_name, is_correct=True, score=score, team_name=team_name)
+    if correct_count > 0 and session_is_accepting(session):
+        record_submission(question_id, team_name, is_correct=True, score=score)
         logger.info("Fake team %s completed Q%s with score %.2f", team_name, question_id, score)
 
 
@@ -135,17 +181,19 @@ def start_fake_team_submissions(question_id: int):
     Args:
         question_id: Question ID
     """
-    from app.services.fake_teams import (
-        generate_submission_attempts,
-        generate_weighted_score,
-        generate_submit_delay
-    )
+    from app.services.fake_teams import generate_special_team_score, simulate_team_batch
     
     session = active_questions[question_id]
     
-    for team_name in session.fake_teams.keys():
+    # Draw every team's attempts, potential score and delay in one batch
+    wrong_counts, correct_counts, scores, delays = simulate_team_batch(
+        len(session.fake_teams), session.time_limit
+    )
+    
+    for team_name, wrong_count, correct_count, team_score, team_delay in zip(
+        session.fake_teams.keys(), wrong_counts, correct_counts, scores, delays
+    ):
         is_special = team_name == "0THING2LOSE"
-        wrong_count, correct_count = generate_submission_attempts()
         
         # Ensure special team always submits once
         if wrong_count == 0 and correct_count == 0:
@@ -157,10 +205,10 @@ def start_fake_team_submissions(question_id: int):
         # Generate score if team completes
         score = None
         if correct_count > 0:
-            score = generate_weighted_score() if not is_special else round(random.uniform(90, 99), 1)
+            score = team_score if not is_special else generate_special_team_score()
         
         # Generate delay
-        delay = 5 if is_special else generate_submit_delay(session.time_limit)
+        delay = 5 if is_special else team_delay
         
         # Create background task
         asyncio.create_task(
@@ -195,6 +243,7 @@ def start_question(question_id: int, time_limit: int = 300, buffer_time: int = 1
     """
     global current_active_question_id
     
+    ground_truth = state.GT_TABLE.get(question_id) if state.GT_TABLE else None
     session = QuestionSession(
         question_id=question_id,
         start_time=time.time(),
@@ -202,14 +251,21 @@ def start_question(question_id: int, time_limit: int = 300, buffer_time: int = 1
         buffer_time=buffer_time,
         is_active=True,
         team_submissions={},
-        fake_teams=initialize_fake_teams(question_id)
+        fake_teams=initialize_fake_teams(question_id),
+        scoring_params=replace(
+            state.SCORING_PARAMS, time_limit=time_limit, buffer_time=buffer_time
+        ),
+        ground_truth=ground_truth,
+        normalizer=NORMALIZERS.get(ground_truth.type) if ground_truth else None
     )
     active_questions[question_id] = session
     current_active_question_id = question_id
+    _purge_idle_team_locks()
+    state.CONFIG_VERSION += 1
+    state.LEADERBOARD_VERSION += 1
     logger.info("Question %s started at %.3f (time=%ss, buffer=%ss)", question_id, session.start_time, time_limit, buffer_time)
     logger.info("Generated %s fake teams for Q%s", len(session.fake_teams), question_id)
     # include already registered real teams
-    from app import state
     for session_id, info in state.TEAM_REGISTRY.items():
         if info["team_id"] not in session.team_submissions:
             session.team_submissions[info["team_id"]] = TeamSubmission(
@@ -217,7 +273,6 @@ def start_question(question_id: int, time_limit: int = 300, buffer_time: int = 1
                 team_name=info["team_name"],
                 team_session_id=session_id,
                 question_id=question_id,
-                submit_times=[],
                 wrong_count=0,
                 correct_count=0
             )
@@ -233,6 +288,28 @@ def get_question_session(question_id: int) -> Optional[QuestionSession]:
     return active_questions.get(question_id)
 
 
+def session_is_accepting(session: QuestionSession) -> bool:
+    """is_question_active for a session object already in hand"""
+    return session.is_active and time.time() <= session.deadline
+
+
+def session_elapsed(session: QuestionSession) -> float:
+    """get_elapsed_time for a session object already in hand (seconds)"""
+    return time.time() - session.start_time
+
+
+def session_remaining(session: QuestionSession) -> float:
+    """get_remaining_time for a session object already in hand (seconds)"""
+    return max(0.0, session.ends_at - time.time())
+
+
+def session_status(session: QuestionSession) -> Tuple[bool, float, float]:
+    """(accepting, elapsed, remaining) for a session from a single clock read"""
+    now = time.time()
+    accepting = session.is_active and now <= session.deadline
+    return accepting, now - session.start_time, max(0.0, session.ends_at - now)
+
+
 def is_question_active(question_id: int) -> bool:
     """
     Check if question is currently accepting submissions
@@ -243,11 +320,7 @@ def is_question_active(question_id: int) -> bool:
     - elapsed_time <= time_limit + buffer_time
     """
     session = active_questions.get(question_id)
-    if not session or not session.is_active:
-        return False
-    
-    elapsed = time.time() - session.start_time
-    return elapsed <= (session.time_limit + session.buffer_time)
+    return session is not None and session_is_accepting(session)
 
 
 def get_elapsed_time(question_id: int) -> float:
@@ -255,7 +328,7 @@ def get_elapsed_time(question_id: int) -> float:
     session = active_questions.get(question_id)
     if not session:
         return 0.0
-    return time.time() - session.start_time
+    return session_elapsed(session)
 
 
 def get_remaining_time(question_id: int) -> float:
@@ -263,10 +336,7 @@ def get_remaining_time(question_id: int) -> float:
     session = active_questions.get(question_id)
     if not session:
         return 0.0
-    
-    elapsed = get_elapsed_time(question_id)
-    remaining = session.time_limit - elapsed
-    return max(0.0, remaining)
+    return session_remaining(session)
 
 
 def get_team_submission(question_id: int, team_id: str) -> Optional[TeamSubmission]:
@@ -281,10 +351,7 @@ def record_submission(
     question_id: int,
     team_id: str,
     is_correct: bool,
-    score: Optional[float] = None,
-    *,
-    team_name: Optional[str] = None,
-    team_session_id: Optional[str] = None
+    score: Optional[float] = None
 ) -> TeamSubmission:
     """
     Record a team's submission
@@ -300,34 +367,18 @@ def record_submission(
     """
     session = active_questions[question_id]
     
-    # Check if this is a fake team
-    is_fake_team = team_id in session.fake_teams
+    # Fake teams update their existing record in fake_teams (one lookup decides)
+    team_sub = session.fake_teams.get(team_id)
+    is_fake_team = team_sub is not None
     
-    # Get or create team submission record
-    if is_fake_team:
-        # For fake teams, update the existing record in fake_teams
-        team_sub = session.fake_teams[team_id]
-        if not hasattr(team_sub, 'submit_times'):
-            team_sub.submit_times = []
-    else:
-        # For real teams, use team_submissions
-        if team_id not in session.team_submissions:
-            session.team_submissions[team_id] = TeamSubmission(
-                team_id=team_id,
-                team_name=team_name or team_id,
-                team_session_id=team_session_id,
-                question_id=question_id,
-                submit_times=[],
-                wrong_count=0,
-                correct_count=0
-            )
+    if not is_fake_team:
+        # Real teams get their row up front (start_question / add_team_to_active_sessions)
         team_sub = session.team_submissions[team_id]
-        if team_name and not team_sub.team_name:
-            team_sub.team_name = team_name
-        if team_session_id and not team_sub.team_session_id:
-            team_sub.team_session_id = team_session_id
     
-    team_sub.submit_times.append(time.time())
+    team_sub.submit_count += 1
+    state.LEADERBOARD_VERSION += 1
+    if not is_fake_team:
+        session.total_submissions += 1
     
     if not is_correct:
         team_sub.wrong_count += 1
@@ -335,8 +386,11 @@ def record_submission(
         team_sub.correct_count += 1
         if not team_sub.is_completed:  # First correct submission
             team_sub.is_completed = True
+            if not is_fake_team:
+                session.completed_count += 1
             team_sub.first_correct_time = time.time()
             team_sub.final_score = score
+            team_sub.rounded_score = round(score, 1) if score else 0
     
     return team_sub
 
@@ -347,15 +401,26 @@ def stop_question(question_id: int) -> None:
     session = active_questions.get(question_id)
     if session:
         session.is_active = False
+        state.CONFIG_VERSION += 1
         logger.info("Question %s stopped by admin", question_id)
+        _purge_team_locks(question_id)
         if current_active_question_id == question_id:
             _refresh_active_question_id()
 
 
-def get_question_leaderboard(question_id: int) -> List[dict]:
+def _leaderboard_key(row: dict) -> Tuple[float, float]:
+    """Leaderboard order: score (desc), then time taken (asc)"""
+    return -row["score"], row["time_taken"]
+
+
+def get_question_leaderboard(question_id: int, top_k: Optional[int] = None) -> List[dict]:
     """
     Get leaderboard for a question
     
+    Args:
+        question_id: Question ID
+        top_k: Only return the best top_k teams (heap selection, no full sort)
+    
     Returns:
         Sorted list of teams by score (desc), then time (asc)
     """
@@ -363,20 +428,24 @@ def get_question_leaderboard(question_id: int) -> List[dict]:
     if not session:
         return []
     
-    results = []
-    for team_id, team_sub in session.team_submissions.items():
-        if team_sub.is_completed and team_sub.final_score is not None:
-            time_taken = team_sub.first_correct_time - session.start_time
-            results.append({
-                "team_id": team_id,
-                "score": team_sub.final_score,
-                "time_taken": round(time_taken, 2),
-                "submit_count": len(team_sub.submit_times),
-                "wrong_count": team_sub.wrong_count
-            })
-    
-    # Sort by score (desc), then time (asc)
-    results.sort(key=lambda x: (-x["score"], x["time_taken"]))
+    # Rows are built lazily, only for completed teams
+    results = (
+        {
+            "team_id": team_id,
+            "score": team_sub.final_score,
+            "time_taken": round(team_sub.first_correct_time - session.start_time, 2),
+            "submit_count": team_sub.submit_count,
+            "wrong_count": team_sub.wrong_count
+        }
+        for team_id, team_sub in session.team_submissions.items()
+        if team_sub.is_completed and team_sub.final_score is not None
+    )
+    
+    # Sort by score (desc), then time (asc); nsmallest keeps the same order for ties
+    if top_k is None:
+        results = sorted(results, key=_leaderboard_key)
+    else:
+        results = heapq.nsmallest(top_k, results, key=_leaderboard_key)
     
     # Add rank
     for idx, result in enumerate(results):
@@ -389,17 +458,17 @@ def get_all_sessions_status() -> List[dict]:
     """Get status of all active questions"""
     status = []
     for qid, session in active_questions.items():
-        total_submissions = sum(len(ts.submit_times) for ts in session.team_submissions.values())
+        accepting, elapsed, remaining = session_status(session)
         status.append({
             "question_id": qid,
-            "is_active": is_question_active(qid),
-            "elapsed_time": round(get_elapsed_time(qid), 2),
-            "remaining_time": round(get_remaining_time(qid), 2),
+            "is_active": accepting,
+            "elapsed_time": round(elapsed, 2),
+            "remaining_time": round(remaining, 2),
             "time_limit": session.time_limit,
             "buffer_time": session.buffer_time,
             "total_teams": len(session.team_submissions),
-            "total_submissions": total_submissions,
-            "completed_teams": sum(1 for ts in session.team_submissions.values() if ts.is_completed)
+            "total_submissions": session.total_submissions,
+            "completed_teams": session.completed_count
         })
     return status
 
@@ -409,12 +478,16 @@ def reset_all_questions() -> int:
     global current_active_question_id
     count = len(active_questions)
     active_questions.clear()
+    _team_locks.clear()
     current_active_question_id = None
+    state.CONFIG_VERSION += 1
+    state.LEADERBOARD_VERSION += 1
     logger.info("Reset all questions. Cleared %s sessions.", count)
     return count
 
 
 def add_team_to_active_sessions(team_id: str, team_name: str, team_session_id: str) -> None:
+    state.LEADERBOARD_VERSION += 1
     for qid, session in active_questions.items():
         if team_id in session.team_submissions:
             continue
@@ -423,7 +496,6 @@ def add_team_to_active_sessions(team_id: str, team_name: str, team_session_id: s
             team_name=team_name,
             team_session_id=team_session_id,
             question_id=qid,
-            submit_times=[],
             wrong_count=0,
             correct_count=0
         )
@@ -15,11 +15,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
 import logging
 import os
+import queue
 
 from app import state
 from app.core.groundtruth import load_groundtruth
+from app.api.responses import GZipNegotiationMiddleware, ORJSONResponse
 
 # Import all API routers
 from app.api import health, admin, submission, leaderboard
@@ -28,9 +31,19 @@ from app.api import team as team_router
 
 
 # Setup logging
+# Request handlers only enqueue records; a background listener thread does the
+# actual stream writes so slow stderr/pipes never stall the event loop.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
+_log_listener = QueueListener(_log_queue, _log_stream_handler)
+# The queue side only renders the message; the stream handler adds the prefix
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(message)s',
+    handlers=[QueueHandler(_log_queue)]
 )
 logger = logging.getLogger(__name__)
 
@@ -38,18 +51,27 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
-    # Startup: Load ground truth into global state
+    _log_listener.start()
     try:
-        state.GT_TABLE = load_groundtruth("data/groundtruth.csv")
-        logger.info(f"✅ Server started with {len(state.GT_TABLE)} ground truth entries")
-    except Exception as e:
-        logger.error(f"❌ Failed to load ground truth: {e}")
-        raise
-    
-    yield
-    
-    # Shutdown
-    logger.info("🛑 Server shutting down")
+        # Startup: Load ground truth into global state
+        try:
+            state.GT_TABLE = load_groundtruth("data/groundtruth.csv")
+            state.GT_QUESTION_IDS = list(state.GT_TABLE)  # Already in ID order
+            config_router.rebuild_config_cache()
+            submission.rebuild_questions_cache()
+            leaderboard.preload_html_pages()
+            logger.info("✅ Server started with %s ground truth entries", len(state.GT_TABLE))
+        except Exception as e:
+            logger.error("❌ Failed to load ground truth: %s", e)
+            raise
+        
+        yield
+        
+        # Shutdown
+        logger.info("🛑 Server shutting down")
+    finally:
+        # Flush queued log records before the process exits
+        _log_listener.stop()
 
 
 # Create FastAPI app
@@ -57,7 +79,8 @@ app = FastAPI(
     title="AIC 2025 - Scoring Server",
     description="Mock scoring server for KIS, QA, TR tasks with multiple events",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware (allow all origins for development)
@@ -69,6 +92,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Gzip larger responses (leaderboard data, HTML pages) for polling dashboards,
+# only for clients whose Accept-Encoding allows it (q-values honoured)
+app.add_middleware(GZipNegotiationMiddleware, minimum_size=500)
+
 
 # ==================== INCLUDE ROUTERS ====================
 
@@ -102,4 +129,6 @@ if os.path.exists("static"):
 
 if __name__ == "__main__":
     import uvicorn
+    # Single process on purpose: sessions and scores are in-memory state.
+    # loop/http default to "auto", which picks uvloop/httptools when installed.
     uvicorn.run(app, host="0.0.0.0", port=8000)
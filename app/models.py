@@ -1,21 +1,29 @@
 """
 Data models for scoring server
 """
-from pydantic import BaseModel, Field
-from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+from pydantic import AliasChoices, BaseModel, Field
+from typing import Any, Callable, Dict, List, Optional
 
 
-class GroundTruth(BaseModel):
-    """Ground truth model for a question"""
+@dataclass(slots=True)
+class GroundTruth:
+    """Ground truth for a question (built once by the CSV loader, read on every submit)"""
     stt: int
     type: str  # "KIS" | "QA" | "TR"
     scene_id: str
     video_id: str
     points: List[int]  # sorted ascending, must have even number of elements
     answer: Optional[str] = None  # For QA: correct answer (uppercase, no accents, no spaces)
+    num_events: int = field(init=False, default=0)  # len(points) // 2, filled in on construction
+    _geometry: Any = field(init=False, default=None, repr=False)  # Cached event arrays, see scoring.event_geometry
+    
+    def __post_init__(self) -> None:
+        self.num_events = len(self.points) // 2
 
 
-class NormalizedSubmission(BaseModel):
+@dataclass(slots=True)
+class NormalizedSubmission:
     """Normalized submission from client"""
     question_id: int
     qtype: str  # "KIS" | "QA" | "TR"
@@ -41,38 +49,102 @@ class Config(BaseModel):
     buffer_time: int = 10
 
 
-class ScoringParams(BaseModel):
-    """Scoring parameters for AIC 2025 Competition"""
+@dataclass(frozen=True, slots=True)
+class ScoringParams:
+    """
+    Scoring parameters for AIC 2025 Competition
+    
+    Plain frozen dataclass: derive per-session copies with dataclasses.replace
+    """
     p_max: float = 100.0      # Maximum score
     p_base: float = 50.0      # Base score at time limit
     p_penalty: float = 10.0   # Penalty per wrong submission
     time_limit: int = 300     # Time limit in seconds
     buffer_time: int = 10     # Buffer for network delay
+    score_span: float = field(init=False, repr=False)  # p_max - p_base, derived
+    
+    def __post_init__(self) -> None:
+        # Frozen: derived constants are set once, and again on every replace()
+        object.__setattr__(self, "score_span", self.p_max - self.p_base)
 
 
-class TeamSubmission(BaseModel):
-    """Track one team's submissions for a question"""
+@dataclass(frozen=True, slots=True)
+class ScoreResult:
+    """Outcome of scoring one submission (see app.core.scoring.calculate_final_score)"""
+    score: float
+    correctness_factor: float
+    match_quality: float
+    time_factor: float
+    base_score: float
+    penalty: float
+    percentage: float
+    matched_events: int
+    total_events: int
+    message: Optional[str] = None  # Why the submission was rejected before matching
+
+
+@dataclass(slots=True)
+class TeamSubmission:
+    """
+    Track one team's submissions for a question
+    
+    Plain slots dataclass: created and mutated on the /submit hot path, never
+    parsed from user input
+    """
     team_id: str
     question_id: int
     team_name: Optional[str] = None
     team_session_id: Optional[str] = None
-    submit_times: List[float] = Field(default_factory=list)  # Timestamps of all submissions
+    submit_count: int = 0                 # Number of submissions (correct + wrong)
     wrong_count: int = 0                  # k = number of wrong submissions
     correct_count: int = 0                # Number of correct submissions (0 or 1)
     first_correct_time: Optional[float] = None
     final_score: Optional[float] = None
+    rounded_score: float = 0              # final_score rounded to 1 decimal for the leaderboard
     is_completed: bool = False
 
 
-class QuestionSession(BaseModel):
-    """Server-controlled session for one question"""
+@dataclass(slots=True)
+class QuestionSession:
+    """Server-controlled session for one question (mutated on every /submit, so no validation)"""
     question_id: int
     start_time: float                     # Unix timestamp
     time_limit: int = 300                 # seconds
     buffer_time: int = 10                 # ±10s buffer
     is_active: bool = True
-    team_submissions: Dict[str, TeamSubmission] = Field(default_factory=dict)
-    fake_teams: Dict[str, TeamSubmission] = Field(default_factory=dict)  # Fake teams for leaderboard
+    team_submissions: Dict[str, TeamSubmission] = field(default_factory=dict)
+    fake_teams: Dict[str, TeamSubmission] = field(default_factory=dict)  # Fake teams for leaderboard
+    scoring_params: Optional[ScoringParams] = None  # Defaults + this session's timing, built at start
+    total_submissions: int = 0            # Real-team submissions recorded so far
+    completed_count: int = 0              # Real teams with a correct submission
+    # Active context resolved once at start, so /submit skips the GT lookup and type dispatch
+    ground_truth: Optional[GroundTruth] = None
+    normalizer: Optional[Callable[[Dict, int], NormalizedSubmission]] = None
+    # Absolute times derived once from start_time (filled in on construction)
+    ends_at: float = field(init=False, default=0.0)     # start_time + time_limit
+    deadline: float = field(init=False, default=0.0)    # ends_at + buffer_time: last accepted moment
     
-    class Config:
-        arbitrary_types_allowed = True
+    def __post_init__(self) -> None:
+        self.ends_at = self.start_time + self.time_limit
+        self.deadline = self.ends_at + self.buffer_time
+
+
+class StartQuestionRequest(BaseModel):
+    """Admin request body for /admin/start-question"""
+    question_id: Optional[int] = None     # Checked by the endpoint: missing → 400
+    time_limit: int = 300                 # seconds
+    buffer_time: int = 10                 # ±10s buffer
+
+
+class StopQuestionRequest(BaseModel):
+    """Admin request body for /admin/stop-question"""
+    question_id: Optional[int] = None     # Checked by the endpoint: missing → 400
+
+
+class SubmitRequest(BaseModel):
+    """Team request body for /submit (answerSets are normalized per task type later)"""
+    team_session_id: Optional[str] = Field(
+        default=None,
+        validation_alias=AliasChoices("teamSessionId", "team_session_id")
+    )
+    answerSets: List[Dict[str, Any]] = Field(default_factory=list)
@@ -1,9 +1,18 @@
 """
 Fake teams generator for leaderboard simulation
 """
-import random
 from typing import List, Tuple
 
+import numpy as np
+
+# Shared PCG64 generator for every sampler in this module
+_rng = np.random.default_rng()
+
+# Weighted score bands used by generate_weighted_scores: (probability, low, high)
+_SCORE_BAND_P = np.array([0.10, 0.30, 0.35, 0.25])
+_SCORE_BAND_LOW = np.array([80.0, 60.0, 40.0, 0.0])
+_SCORE_BAND_HIGH = np.array([100.0, 80.0, 60.0, 40.0])
+
 # Pool of real AIC 2025 team names + AI Giants
 TEAM_NAMES = [
     # AIC 2025 Teams
@@ -29,18 +38,16 @@ def generate_fake_team_names(count: int = 36) -> List[str]:
     Returns:
         List of unique team names
     """
-    available = TEAM_NAMES[:]
-    
-    # Use all available teams, or sample if count is less
-    if count >= len(available):
-        return available
+    # Use all available teams, or sample straight from the module-level pool
+    if count >= len(TEAM_NAMES):
+        return list(TEAM_NAMES)
     
-    return random.sample(available, count)
+    return _rng.choice(TEAM_NAMES, size=count, replace=False).tolist()
 
 
-def generate_weighted_score() -> float:
+def generate_weighted_scores(n: int) -> np.ndarray:
     """
-    Generate random score with weighted distribution
+    Draw n scores with a weighted distribution
     
     Score distribution:
     - 80-100: 10%  (buff high rollers)
@@ -48,72 +55,86 @@ def generate_weighted_score() -> float:
     - 40-60: 35%  (medium scores)
     - 0-40 : 25%  (low scores)
     
+    Args:
+        n: Number of scores to generate
+        
     Returns:
-        Score between 0 and 100
-    """
-    rand = random.random()
-    
-    if rand < 0.10:
-        return round(random.uniform(80, 100), 1)
-    elif rand < 0.40:
-        return round(random.uniform(60, 80), 1)
-    elif rand < 0.75:
-        return round(random.uniform(40, 60), 1)
-    else:
-        return round(random.uniform(0, 40), 1)
-
-
-def should_submit() -> bool:
-    """
-    Determine if a team should submit
-    
-    85% of teams submit, 15% don't submit
-    
-    Returns:
-        True if team submits, False otherwise
+        Array of n scores between 0 and 100 (rounded to 1 decimal)
     """
-    return random.random() < 0.85
+    bands = _rng.choice(len(_SCORE_BAND_P), size=n, p=_SCORE_BAND_P)
+    return _rng.uniform(_SCORE_BAND_LOW[bands], _SCORE_BAND_HIGH[bands]).round(1)
 
 
-def generate_submission_attempts() -> Tuple[int, int]:
+def generate_submission_attempts_batch(n: int) -> Tuple[np.ndarray, np.ndarray]:
     """
-    Generate random submission attempts (wrong and correct)
+    Draw submission attempts (wrong and correct) for n teams
     
     Distribution:
+    - 15%: No submission at all (0 wrong, 0 correct)
+    Of the teams that submit:
     - 60%: Correct on first try (0 wrong, 1 correct)
     - 25%: 1 wrong attempt then correct (1 wrong, 1 correct)
     - 10%: 2-3 wrong attempts then correct (2-3 wrong, 1 correct)
     - 5%: Only wrong attempts, no correct (1-3 wrong, 0 correct)
-    - 15%: No submission at all (handled by should_submit)
     
+    Args:
+        n: Number of teams
+        
     Returns:
-        Tuple of (wrong_count, correct_count)
+        (wrong_counts, correct_counts) integer arrays of length n
     """
-    if not should_submit():
-        return (0, 0)  # No submission
-    
-    rand = random.random()
-    
-    if rand < 0.60:  # 60% - Correct first try
-        return (0, 1)
-    elif rand < 0.85:  # 25% - 1 wrong then correct
-        return (1, 1)
-    elif rand < 0.95:  # 10% - 2-3 wrong then correct
-        return (random.randint(2, 3), 1)
-    else:  # 5% - Only wrong attempts, no correct
-        return (random.randint(1, 3), 0)
+    submits = _rng.random(n) < 0.85
+    # Branch per team: 0 = correct first try, 1 = 1 wrong, 2 = 2-3 wrong, 3 = wrong only
+    branch = np.searchsorted([0.60, 0.85, 0.95], _rng.random(n), side="right")
+    wrong = np.select(
+        [branch == 1, branch == 2, branch == 3],
+        [1, _rng.integers(2, 4, n), _rng.integers(1, 4, n)],
+        default=0
+    )
+    correct = (branch < 3).astype(np.int64)
+    return np.where(submits, wrong, 0), np.where(submits, correct, 0)
 
 
-def generate_submit_delay(time_limit: float) -> float:
+def generate_submit_delays(time_limit: float, n: int) -> np.ndarray:
     """
-    Generate random delay before fake team submits.
+    Draw n delays (seconds) before fake teams submit
     
-    Delay is scaled to the current question time limit so fake teams always
+    Delays are scaled to the current question time limit so fake teams always
     submit while the question is still active.
     """
     if time_limit <= 0:
-        return 1.0
+        return np.ones(n)
     
     min_delay = max(0.5, time_limit * 0.02)   # 2% of duration (>=0.5s)
     max_delay = max(min_delay, time_limit * 0.6)  # cap ở 60% thời lượng để leaderboard lên điểm sớm
-    return random.uniform(min_delay, max_delay)
+    return _rng.uniform(min_delay, max_delay, n)
+
+
+def generate_attempt_gap() -> float:
+    """Seconds a fake team waits between two of its attempts"""
+    return float(_rng.uniform(1, 5))
+
+
+def generate_special_team_score() -> float:
+    """Score of the team that always submits (0THING2LOSE): 90-99, 1 decimal"""
+    return round(float(_rng.uniform(90, 99)), 1)
+
+
+def simulate_team_batch(
+    n: int,
+    time_limit: float
+) -> Tuple[List[int], List[int], List[float], List[float]]:
+    """
+    Draw a whole question's fake-team plan in one call
+    
+    Args:
+        n: Number of fake teams
+        time_limit: Question time limit (seconds), used to scale delays
+        
+    Returns:
+        (wrong_counts, correct_counts, scores, delays) as plain lists of length n
+    """
+    wrong, correct = generate_submission_attempts_batch(n)
+    scores = generate_weighted_scores(n)
+    delays = generate_submit_delays(time_limit, n)
+    return wrong.tolist(), correct.tolist(), scores.tolist(), delays.tolist()
@@ -8,7 +8,9 @@ from app.models import TeamSubmission
 
 
 def _generate_team_ids(team_name: str) -> Dict[str, str]:
-    slug = team_name.strip().lower().replace(' ', '-')[:20]
+    # team_name is already stripped by register_team; cut to slug length before
+    # transforming so long names aren't lowercased/copied in full
+    slug = team_name[:20].lower().replace(' ', '-')[:20]
     unique_suffix = uuid.uuid4().hex[:6]
     team_id = f"team-{slug}-{unique_suffix}" if slug else f"team-{unique_suffix}"
     team_session_id = uuid.uuid4().hex
@@ -27,7 +29,7 @@ def register_team(team_name: str) -> Dict[str, str]:
         "team_session_id": ids["team_session_id"],
     }
     state.TEAM_REGISTRY[info["team_session_id"]] = info
-    state.TEAM_INDEX[info["team_id"]] = info["team_session_id"]
+    state.TEAM_BY_ID[info["team_id"]] = info
 
     # Add placeholder submissions to active sessions
     session_core.add_team_to_active_sessions(
@@ -44,7 +46,5 @@ def get_team_by_session(team_session_id: str) -> Dict[str, str]:
 
 
 def get_team_name(team_id: str) -> str:
-    session_id = state.TEAM_INDEX.get(team_id)
-    if not session_id:
-        return team_id
-    return state.TEAM_REGISTRY.get(session_id, {}).get("team_name", team_id)
+    info = state.TEAM_BY_ID.get(team_id)
+    return info["team_name"] if info else team_id
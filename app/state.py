@@ -2,7 +2,7 @@
 Global application state
 Shared resources accessible across all modules
 """
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from app.models import ScoringParams
 
@@ -10,11 +10,29 @@ from app.models import ScoringParams
 # Loaded at startup and accessible throughout the application
 GT_TABLE: Optional[Dict] = None
 
+# Question ids of GT_TABLE in ascending order (computed once at load time)
+GT_QUESTION_IDS: List[int] = []
+
+# /questions body ({"questions": [...]} in question id order), encoded once with orjson
+QUESTIONS_BODY: bytes = b""
+
 # Default scoring parameters (applied to every session unless overridden)
 SCORING_PARAMS: ScoringParams = ScoringParams()
 
 # Registered teams: mapping session-id -> team info (team_id, team_name)
 TEAM_REGISTRY: Dict[str, Dict[str, str]] = {}
 
-# Convenience index from team_id -> session-id
-TEAM_INDEX: Dict[str, str] = {}
+# Same team info dicts keyed by team_id (one lookup for names on leaderboard rows)
+TEAM_BY_ID: Dict[str, Dict[str, str]] = {}
+
+# Static part of the /config response (scoring defaults + per-question info)
+# Built once after ground truth is loaded, see app.api.config.rebuild_config_cache
+CONFIG_CACHE: Optional[Dict] = None
+
+# Bumped on every admin session change (start/stop/reset); used as ETag seed
+# for /config and /questions so polling clients can revalidate cheaply
+CONFIG_VERSION: int = 0
+
+# Bumped on every change that affects leaderboard rows (submissions, new
+# sessions, new teams, reset); lets /api/leaderboard-data reuse its last result
+LEADERBOARD_VERSION: int = 0
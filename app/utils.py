@@ -1,31 +1,30 @@
 """
 Utility functions
 """
-from typing import List, Tuple
+from typing import List
 
+import numpy as np
 
-def points_to_events(points: List[int]) -> List[Tuple[int, int]]:
+
+def points_to_events(points: List[int]) -> np.ndarray:
     """
-    Convert a list of points to a list of events (pairs of points)
+    Convert a list of points to an array of events (pairs of points)
     
     Args:
         points: List of integers [p1, p2, p3, p4, ...]
                Must have even number of elements
                
     Returns:
-        List of tuples [(p1, p2), (p3, p4), ...]
+        Array of shape [num_events, 2]: [[p1, p2], [p3, p4], ...]
         
     Raises:
         AssertionError: If points count is not even
         
     Example:
-        >>> points_to_events([4890, 5000, 5001, 5020])
-        [(4890, 5000), (5001, 5020)]
+        >>> points_to_events([4890, 5000, 5001, 5020]).tolist()
+        [[4890, 5000], [5001, 5020]]
     """
     assert len(points) % 2 == 0, "Points count must be even"
     
-    events = []
-    for i in range(0, len(points), 2):
-        events.append((points[i], points[i + 1]))
-    
-    return events
+    # One C-level copy + reshape instead of building a tuple per event
+    return np.asarray(points, dtype=np.int64).reshape(-1, 2)
@@ -0,0 +1,331 @@
+"""
+Tests for HTTP endpoint behaviour (caching headers, submit error mapping, sessions)
+"""
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.submission import MAX_SUBMIT_BODY_BYTES
+from app.core import session as session_core
+from app.main import app
+
+
+@pytest.fixture(scope="module")
+def client():
+    """One app instance (ground truth loaded once) for the whole module"""
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture(autouse=True)
+def reset_sessions():
+    """Every test starts and ends without question sessions"""
+    session_core.reset_all_questions()
+    yield
+    session_core.reset_all_questions()
+
+
+@pytest.mark.parametrize("path", ["/leaderboard-ui", "/admin-dashboard"])
+@pytest.mark.parametrize("encoding", ["gzip", "identity"])
+def test_html_page_etag_per_encoding(client, path, encoding):
+    """Each Content-Encoding gets its own strong ETag and revalidates to 304"""
+    first = client.get(path, headers={"accept-encoding": encoding})
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.endswith('-gz"') == (encoding == "gzip")
+    assert (first.headers.get("content-encoding") == "gzip") == (encoding == "gzip")
+
+    again = client.get(path, headers={"accept-encoding": encoding, "if-none-match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+
+    # The other representation's validator must not match
+    other = "identity" if encoding == "gzip" else "gzip"
+    mismatch = client.get(path, headers={"accept-encoding": other, "if-none-match": etag})
+    assert mismatch.status_code == 200
+    assert mismatch.headers["etag"] != etag
+
+
+@pytest.mark.parametrize("accept_encoding,gzipped", [
+    ("gzip", True),
+    ("gzip;q=0.5, identity", True),
+    ("br, *", True),
+    ("gzip;q=0", False),
+    ("GZIP; Q=0.0, br", False),
+    ("*, gzip;q=0", False),
+    ("*;q=0", False),
+    ("identity", False),
+    ("", False),
+])
+def test_html_page_honours_gzip_q_values(client, accept_encoding, gzipped):
+    """Only a gzip (or *) entry with q > 0 gets the gzip variant; both vary on Accept-Encoding"""
+    response = client.get("/leaderboard-ui", headers={"accept-encoding": accept_encoding})
+    assert response.status_code == 200
+    assert (response.headers.get("content-encoding") == "gzip") == gzipped
+    assert response.headers["etag"].endswith('-gz"') == gzipped
+    assert "Accept-Encoding" in response.headers["vary"].split(", ")
+
+    again = client.get("/leaderboard-ui", headers={"accept-encoding": accept_encoding, "if-none-match": response.headers["etag"]})
+    assert again.status_code == 304
+    assert "Accept-Encoding" in again.headers["vary"].split(", ")
+
+
+def test_json_not_gzipped_when_refused(client, active_question):
+    """The middleware honours gzip;q=0 too, not just the HTML pages"""
+    refused = client.get("/api/leaderboard-data", headers={"accept-encoding": "gzip;q=0"})
+    assert len(refused.content) >= 500  # Over the middleware's minimum_size
+    assert "content-encoding" not in refused.headers
+
+    accepted = client.get("/api/leaderboard-data", headers={"accept-encoding": "gzip"})
+    assert accepted.headers["content-encoding"] == "gzip"
+
+
+@pytest.fixture
+def active_question(client):
+    """Start question 1 so /submit gets past the active-question dependency"""
+    response = client.post("/admin/start-question", json={"question_id": 1})
+    assert response.status_code == 200
+    return 1
+
+
+def test_submit_rejects_oversized_content_length(client, active_question):
+    """A Content-Length over the limit is refused before the body is read"""
+    response = client.post(
+        "/submit",
+        content=b"{}",
+        headers={"content-type": "application/json", "content-length": str(MAX_SUBMIT_BODY_BYTES + 1)}
+    )
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Request body too large"}
+
+
+def test_submit_rejects_oversized_chunked_body(client, active_question):
+    """Without a Content-Length the body is counted as it streams in and cut off early"""
+    chunk_size = 8 * 1024
+    sent = []
+
+    async def chunks():
+        for _ in range(4 * MAX_SUBMIT_BODY_BYTES // chunk_size):
+            sent.append(chunk_size)
+            yield b"a" * chunk_size
+
+    async def post_chunked():
+        # TestClient buffers generator bodies; ASGITransport feeds them chunk by chunk
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as ac:
+            return await ac.post("/submit", content=chunks(), headers={"content-type": "application/json"})
+
+    response = asyncio.run(post_chunked())
+    assert response.request.headers.get("content-length") is None
+    assert response.status_code == 413
+    assert response.json() == {"detail": "Request body too large"}
+    # Stopped at the first chunk past the limit, not after the whole upload
+    assert len(sent) == MAX_SUBMIT_BODY_BYTES // chunk_size + 1
+
+
+def test_submit_malformed_json(client, active_question):
+    """Undecodable bodies are a 400 with the decoder message, not a 500"""
+    response = client.post("/submit", content=b"{not json", headers={"content-type": "application/json"})
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid JSON body: ")
+
+
+@pytest.mark.parametrize("body", [
+    pytest.param({"answerSets": [{"answers": []}]}, id="missing"),
+    pytest.param({"teamSessionId": "", "answerSets": [{"answers": []}]}, id="empty"),
+])
+def test_submit_missing_team_session_id(client, active_question, body):
+    response = client.post("/submit", json=body)
+    assert response.status_code == 400
+    assert response.json() == {"detail": "teamSessionId is required"}
+
+
+@pytest.mark.parametrize("body,loc", [
+    pytest.param({"teamSessionId": 5, "answerSets": [{}]}, ["teamSessionId"], id="wrong-type"),
+    pytest.param([1], [], id="not-an-object"),
+])
+def test_submit_invalid_envelope(client, active_question, body, loc):
+    """Envelope validation errors are a 400 listing type/loc/msg per error"""
+    response = client.post("/submit", json=body)
+    assert response.status_code == 400
+    errors = response.json()["detail"]
+    assert [error["loc"] for error in errors] == [loc]
+    assert set(errors[0]) == {"type", "loc", "msg"}
+
+
+@pytest.mark.parametrize("path", ["/config", "/questions"])
+def test_conditional_get_returns_304(client, path):
+    """A poll repeating the last ETag gets an empty 304"""
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    again = client.get(path, headers={"if-none-match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+
+@pytest.mark.parametrize("path", ["/config", "/questions"])
+def test_etag_changes_after_start_question(client, path):
+    """start_question bumps CONFIG_VERSION, so the old ETag no longer matches"""
+    etag = client.get(path).headers["etag"]
+    assert client.post("/admin/start-question", json={"question_id": 1}).status_code == 200
+
+    response = client.get(path, headers={"if-none-match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_leaderboard_shows_submission_immediately(client, active_question):
+    """A submission invalidates the cached leaderboard body at once"""
+    team = client.post("/teams/register", json={"team_name": "Cache Check"}).json()
+    gt = client.get("/config").json()["questions"][str(active_question)]
+    assert gt["type"] == "KIS"
+    points = gt["points"]
+
+    def my_score():
+        teams = client.get("/api/leaderboard-data").json()["teams"]
+        row = next(t for t in teams if t["team_name"] == "Cache Check")
+        return row["questions"][str(active_question)]["score"]
+
+    assert my_score() == 0  # Body is now cached
+
+    # Hit the center of every event
+    answers = [
+        {"mediaItemName": f"{gt['scene_id']}_{gt['video_id']}", "start": str(mid), "end": str(mid)}
+        for mid in ((start + end) // 2 for start, end in zip(points[::2], points[1::2]))
+    ]
+    response = client.post("/submit", json={"teamSessionId": team["team_session_id"], "answerSets": [{"answers": answers}]})
+    assert response.status_code == 200 and response.json()["success"] is True
+
+    assert my_score() == round(response.json()["score"], 1) > 0
+
+
+def test_leaderboard_follows_question_expiry(client, active_question):
+    """A question running out of time is not a write, but still rebuilds the cached body"""
+    assert client.get("/api/leaderboard-data").json()["active_question_id"] == active_question
+
+    session = session_core.get_question_session(active_question)
+    session.deadline = 0.0  # Window closed, no version bump
+    assert client.get("/api/leaderboard-data").json()["active_question_id"] is None
+
+
+def test_question_leaderboard_limit(client, active_question):
+    """?limit=N returns the first N rows of the full ranking"""
+    scores = {"Rank A": 70.0, "Rank B": 95.5, "Rank C": 88.0, "Rank D": 95.5}
+    for name, score in scores.items():
+        team_id = client.post("/teams/register", json={"team_name": name}).json()["team_id"]
+        session_core.record_submission(active_question, team_id, True, score)
+
+    path = f"/api/leaderboard/{active_question}"
+    full = client.get(path).json()["teams"]
+    assert [row["score"] for row in full] == [95.5, 95.5, 88.0, 70.0]
+    assert [row["rank"] for row in full] == [1, 2, 3, 4]
+
+    top = client.get(path, params={"limit": 2}).json()
+    assert top == {"question_id": active_question, "teams": full[:2]}
+    assert client.get(path, params={"limit": 10}).json()["teams"] == full
+    assert client.get(path, params={"limit": 0}).status_code == 422
+
+
+def test_question_leaderboard_not_started(client):
+    response = client.get("/api/leaderboard/1")
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Question 1 not started"}
+
+
+def test_start_question_purges_idle_team_locks(client):
+    """Locks of questions that stopped accepting (e.g. expired) go away on the next start"""
+    session_core.get_team_lock(99, "team-x")  # No session for question 99
+    assert client.post("/admin/start-question", json={"question_id": 1}).status_code == 200
+    session_core.get_team_lock(1, "team-x")
+    assert client.post("/admin/start-question", json={"question_id": 2}).status_code == 200
+    assert (99, "team-x") not in session_core._team_locks
+    assert (1, "team-x") in session_core._team_locks  # Question 1 is still accepting
+
+
+def test_stop_question_keeps_held_team_lock(client, active_question):
+    """A submit still holding its lock when the question stops keeps that lock"""
+    async def stop_while_held():
+        held = session_core.get_team_lock(active_question, "team-busy")
+        idle = session_core.get_team_lock(active_question, "team-idle")
+        async with held:
+            session_core.stop_question(active_question)
+            # A later submit from the same team must wait on the same lock
+            assert session_core.get_team_lock(active_question, "team-busy") is held
+        assert session_core.get_team_lock(active_question, "team-idle") is not idle
+
+    asyncio.run(stop_while_held())
+
+
+def test_concurrent_submissions_from_one_team_are_serialized(client, active_question):
+    """Two in-flight wrong answers from one team each count once, in order"""
+    team = client.post("/teams/register", json={"team_name": "Double Submit"}).json()
+    gt = client.get("/config").json()["questions"][str(active_question)]
+    body = {
+        "teamSessionId": team["team_session_id"],
+        "answerSets": [{"answers": [{"mediaItemName": f"{gt['scene_id']}_{gt['video_id']}", "start": "1", "end": "1"}]}]
+    }
+
+    async def submit_twice():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as ac:
+            return await asyncio.gather(ac.post("/submit", json=body), ac.post("/submit", json=body))
+
+    responses = asyncio.run(submit_twice())
+    assert [r.status_code for r in responses] == [200, 200]
+    # Each submission saw the other's penalty or none: k was read under the lock
+    assert sorted(r.json()["detail"]["wrong_count"] for r in responses) == [1, 2]
+
+    team_sub = session_core.get_team_submission(active_question, team["team_id"])
+    assert (team_sub.wrong_count, team_sub.submit_count) == (2, 2)
+
+
+def test_submission_counters_and_stop_summary(client, active_question):
+    """Running counters track wrong → correct → post-correct submissions"""
+    team = client.post("/teams/register", json={"team_name": "Counter Check"}).json()
+    gt = client.get("/config").json()["questions"][str(active_question)]
+    points = gt["points"]
+    media = f"{gt['scene_id']}_{gt['video_id']}"
+    wrong = [{"mediaItemName": media, "start": "1", "end": "1"}]
+    correct = [
+        {"mediaItemName": media, "start": str(mid), "end": str(mid)}
+        for mid in ((start + end) // 2 for start, end in zip(points[::2], points[1::2]))
+    ]
+
+    def submit(answers):
+        response = client.post("/submit", json={"teamSessionId": team["team_session_id"], "answerSets": [{"answers": answers}]})
+        assert response.status_code == 200
+        return response.json()
+
+    def counters():
+        session = session_core.get_question_session(active_question)
+        team_sub = session.team_submissions[team["team_id"]]
+        return (session.total_submissions, session.completed_count, team_sub.submit_count,
+                team_sub.wrong_count, team_sub.correct_count)
+
+    assert counters() == (0, 0, 0, 0, 0)
+    assert submit(wrong)["success"] is False
+    assert counters() == (1, 0, 1, 1, 0)
+    assert submit(correct)["success"] is True
+    assert counters() == (2, 1, 2, 1, 1)
+    # Rejected before recording: no counter moves
+    assert submit(correct)["error"] == "already_completed"
+    assert counters() == (2, 1, 2, 1, 1)
+
+    status = client.get("/admin/sessions").json()["sessions"][0]
+    assert (status["total_submissions"], status["completed_teams"]) == (2, 1)
+    summary = client.post("/admin/stop-question", json={"question_id": active_question}).json()
+    assert (summary["total_submissions"], summary["completed_teams"]) == (2, 1)
+
+
+@pytest.mark.parametrize("path", ["/admin/start-question", "/admin/stop-question"])
+@pytest.mark.parametrize("body", [{}, {"question_id": None}, {"question_id": 0}], ids=["missing", "null", "zero"])
+def test_admin_requires_question_id(client, path, body):
+    """A missing question_id is a 400, as before the request models were added"""
+    response = client.post(path, json=body)
+    assert response.status_code == 400
+    assert response.json() == {"detail": "question_id required"}
@@ -0,0 +1,37 @@
+"""
+Tests for the batched fake-team samplers
+"""
+import pytest
+
+from app.services.fake_teams import simulate_team_batch
+
+
+@pytest.mark.parametrize("n", [0, 1, 500])
+@pytest.mark.parametrize("time_limit", [300, 10, 5])
+def test_simulate_team_batch_shapes_and_ranges(n, time_limit):
+    wrong, correct, scores, delays = simulate_team_batch(n, time_limit)
+    assert [len(wrong), len(correct), len(scores), len(delays)] == [n] * 4
+
+    # Plain Python numbers, not NumPy scalars
+    assert all(type(w) is int for w in wrong) and all(type(c) is int for c in correct)
+    assert all(type(s) is float for s in scores) and all(type(d) is float for d in delays)
+
+    assert all(c in (0, 1) for c in correct)
+    assert all(0 <= w <= 3 for w in wrong)
+    assert all(0 <= s <= 100 and s == round(s, 1) for s in scores)
+
+    min_delay = max(0.5, time_limit * 0.02)
+    max_delay = max(min_delay, time_limit * 0.6)
+    assert all(min_delay <= d <= max_delay for d in delays)
+
+
+def test_simulate_team_batch_without_time_limit():
+    """A non-positive time limit falls back to a one-second delay"""
+    assert simulate_team_batch(3, 0)[3] == [1.0, 1.0, 1.0]
+
+
+def test_simulate_team_batch_covers_every_outcome():
+    """Over many teams exactly the documented (wrong, correct) outcomes show up"""
+    wrong, correct, _, _ = simulate_team_batch(5000, 300)
+    outcomes = set(zip(wrong, correct))
+    assert {(0, 0), (0, 1), (1, 1), (2, 1), (3, 1), (1, 0), (2, 0), (3, 0)} == outcomes
@@ -0,0 +1,106 @@
+"""
+Tests for submission normalizers (KIS, QA, TR text parsing)
+"""
+import re
+
+import pytest
+from app.core.normalizer import normalize_kis, normalize_qa, normalize_tr
+
+
+def _text_body(*texts):
+    return {"answerSets": [{"answers": [{"text": text} for text in texts]}]}
+
+
+QA_INVALID = "Invalid QA answer format. Expected: QA-<ANSWER>-<SCENE_ID>_<VIDEO_ID>-<MS>, got: "
+TR_INVALID = "Invalid TR answer format. Expected: TR-<SCENE_ID>_<VIDEO_ID>-<FRAME_IDS>, got: "
+
+# (text, expected (answer, scene_id, video_id, values))
+QA_ACCEPT_CASES = [
+    pytest.param("QA-MOCCHAU-L26_V017-4999,5049", ("MOCCHAU", "L26", "V017", [4999, 5049]), id="basic"),
+    pytest.param("QA-A-B-C-L26_V017-1,2", ("A-B-C", "L26", "V017", [1, 2]), id="answer-with-dashes"),
+    # Right-most media-shaped part wins, as with the greedy regex
+    pytest.param("QA-X-L1_V1-L26_V017-5", ("X-L1_V1", "L26", "V017", [5]), id="media-shaped-answer"),
+    pytest.param("  QA-ANS-L26_V017-4999\t", ("ANS", "L26", "V017", [4999]), id="surrounding-whitespace"),
+    pytest.param("QA-ANS-L26_V017- 1 , 2 ,", ("ANS", "L26", "V017", [1, 2]), id="spaced-times-trailing-comma"),
+    pytest.param("QA-Mộc Châu-L26_V017-1", ("Mộc Châu", "L26", "V017", [1]), id="answer-kept-verbatim"),
+]
+
+
+@pytest.mark.parametrize("text,expected", QA_ACCEPT_CASES)
+def test_normalize_qa_accepts(text, expected):
+    sub = normalize_qa(_text_body(text), 1)
+    assert (sub.answer, sub.scene_id, sub.video_id, sub.values) == expected
+
+
+# (text, error message) - messages are the ones the regex parser produced
+QA_REJECT_CASES = [
+    pytest.param("garbage", QA_INVALID + "garbage", id="garbage"),
+    pytest.param("QA--L26_V017-1", QA_INVALID + "QA--L26_V017-1", id="empty-answer"),
+    pytest.param("QA-ANS-L26-V017-1", QA_INVALID + "QA-ANS-L26-V017-1", id="media-with-dash"),
+    pytest.param("QA-ANS-L2_6_V017-1", QA_INVALID + "QA-ANS-L2_6_V017-1", id="media-extra-underscore"),
+    pytest.param(" QA-ANS-L26_V017- ", QA_INVALID + "QA-ANS-L26_V017-", id="blank-times"),
+    pytest.param("KIS-ANS-L26_V017-1", QA_INVALID + "KIS-ANS-L26_V017-1", id="wrong-prefix"),
+    pytest.param("QA-ANS-L26_V017-1-2", "invalid literal for int() with base 10: '1-2'", id="dash-in-times"),
+    pytest.param("QA-ANS-L26_V017-1, x ", "invalid literal for int() with base 10: 'x'", id="non-integer-time"),
+]
+
+
+@pytest.mark.parametrize("text,message", QA_REJECT_CASES)
+def test_normalize_qa_rejects(text, message):
+    with pytest.raises(ValueError, match=f"^{re.escape(message)}$"):
+        normalize_qa(_text_body(text), 1)
+
+
+# (text, expected (scene_id, video_id, values))
+TR_ACCEPT_CASES = [
+    pytest.param("TR-L26_V017-499,549,600", ("L26", "V017", [499, 549, 600]), id="basic"),
+    pytest.param(" TR-L26_V017- 499 ,549, ", ("L26", "V017", [499, 549]), id="whitespace-trailing-comma"),
+]
+
+
+@pytest.mark.parametrize("text,expected", TR_ACCEPT_CASES)
+def test_normalize_tr_accepts(text, expected):
+    sub = normalize_tr(_text_body(text), 1)
+    assert (sub.scene_id, sub.video_id, sub.values) == expected
+
+
+# (text, error message) - messages are the ones the regex parser produced
+TR_REJECT_CASES = [
+    pytest.param("TR-L26_V017", TR_INVALID + "TR-L26_V017", id="one-dash"),
+    pytest.param("TR", TR_INVALID + "TR", id="no-dash"),
+    pytest.param("TR-L26_V017-", TR_INVALID + "TR-L26_V017-", id="empty-frames"),
+    pytest.param("TR-L26_V017-  ", TR_INVALID + "TR-L26_V017-", id="blank-frames"),
+    pytest.param("TR-L26-V017-1", TR_INVALID + "TR-L26-V017-1", id="dash-in-media"),
+    pytest.param("QA-L26_V017-1", TR_INVALID + "QA-L26_V017-1", id="wrong-prefix"),
+    pytest.param("TR-L26_V017-1-2", "invalid literal for int() with base 10: '1-2'", id="extra-dash"),
+    pytest.param("TR-L26_V017-1, x", "invalid literal for int() with base 10: 'x'", id="non-integer-frame"),
+    pytest.param("TR-L26_V017-1.5", "invalid literal for int() with base 10: '1.5'", id="float-frame"),
+    pytest.param("TR-L26_V017-,,", "No frame IDs found in TR answer", id="only-commas"),
+]
+
+
+@pytest.mark.parametrize("text,message", TR_REJECT_CASES)
+def test_normalize_tr_rejects(text, message):
+    with pytest.raises(ValueError, match=f"^{re.escape(message)}$"):
+        normalize_tr(_text_body(text), 1)
+
+
+def test_normalize_kis_dedupes_values():
+    """A single timestamp (start == end) and a repeated answer are one value each"""
+    body = {"answerSets": [{"answers": [
+        {"mediaItemName": "L26_V017", "start": "5000", "end": "5000"},
+        {"mediaItemName": "L26_V017", "start": "4999", "end": "5049"},
+        {"mediaItemName": "L26_V017", "start": 5000},
+    ]}]}
+    assert normalize_kis(body, 1).values == [5000, 4999, 5049]
+
+
+def test_normalize_qa_dedupes_values():
+    """Times repeated within or across answers count once, first-seen order kept"""
+    sub = normalize_qa(_text_body("QA-ANS-L26_V017-5049,4999,5049", "QA-ANS-L26_V017-4999"), 1)
+    assert sub.values == [5049, 4999]
+
+
+def test_normalize_tr_dedupes_values():
+    """Repeated frame ids count once, first-seen order kept"""
+    assert normalize_tr(_text_body("TR-L26_V017-600,499,600,499"), 1).values == [600, 499]
@@ -0,0 +1,21 @@
+"""
+Tests for API route registration
+"""
+from collections import Counter
+
+from app.api import health, admin, submission, leaderboard
+from app.api import config as config_router
+from app.api import team as team_router
+
+
+def test_each_route_registered_once():
+    """Every (method, path) pair should be served by exactly one router endpoint"""
+    routers = [health, admin, submission, leaderboard, config_router, team_router]
+    counts = Counter(
+        (method, route.path)
+        for module in routers
+        for route in module.router.routes
+        for method in route.methods
+    )
+    duplicates = [key for key, n in counts.items() if n > 1]
+    assert duplicates == []
@@ -7,30 +7,35 @@ from app.core.scoring import (
     check_match_with_tolerance,
     calculate_correctness_factor,
     calculate_final_score,
+    score_submission,
     TOLERANCE_MS,
     TOLERANCE_FRAMES
 )
-from app.models import ScoringParams
+from app.core.normalizer import normalize_kis
+from app.models import GroundTruth, ScoringParams
+from app.utils import points_to_events
 
 
-def test_time_factor_start():
-    """Time factor at t=0 should be 1.0"""
-    assert calculate_time_factor(0, 300) == 1.0
+# (elapsed, time_limit, expected factor)
+TIME_FACTOR_CASES = [
+    pytest.param(0, 300, 1.0, id="start"),
+    pytest.param(150, 300, 0.5, id="half"),
+    pytest.param(300, 300, 0.0, id="end"),
+    pytest.param(350, 300, 0.0, id="exceeded"),
+]
 
 
-def test_time_factor_half():
-    """Time factor at t=150s (half) should be 0.5"""
-    assert calculate_time_factor(150, 300) == 0.5
+@pytest.mark.parametrize("elapsed,time_limit,expected", TIME_FACTOR_CASES)
+def test_time_factor(elapsed, time_limit, expected):
+    """Time factor falls linearly from 1.0 at t=0 to 0.0 at (and past) the limit"""
+    assert calculate_time_factor(elapsed, time_limit) == expected
 
 
-def test_time_factor_end():
-    """Time factor at t=300s (end) should be 0.0"""
-    assert calculate_time_factor(300, 300) == 0.0
-
-
-def test_time_factor_exceeded():
-    """Time factor past time limit should be 0.0"""
-    assert calculate_time_factor(350, 300) == 0.0
+def test_points_to_events():
+    """Flat GT points become [start, end] rows; an odd count is rejected"""
+    assert points_to_events([4890, 5000, 5001, 5020]).tolist() == [[4890, 5000], [5001, 5020]]
+    with pytest.raises(AssertionError):
+        points_to_events([1, 2, 3])
 
 
 def test_tolerance_match_perfect():
@@ -73,141 +78,93 @@ def test_tolerance_match_multiple_events():
     assert quality == 1.0  # Both at centers
 
 
-def test_correctness_kis_full():
-    """KIS: 100% correct with quality → factor = quality"""
-    factor = calculate_correctness_factor(2, 2, "KIS", avg_quality=1.0)
-    assert factor == 1.0
-    
-    # With lower quality
-    factor = calculate_correctness_factor(2, 2, "KIS", avg_quality=0.75)
-    assert factor == 0.75
-
-
-def test_correctness_kis_partial():
-    """KIS: <100% correct → factor 0.0 (no score)"""
-    factor = calculate_correctness_factor(1, 2, "KIS", avg_quality=1.0)
-    assert factor == 0.0
-
-
-def test_correctness_qa_full():
-    """QA: 100% correct with quality → factor = quality"""
-    factor = calculate_correctness_factor(1, 1, "QA", avg_quality=1.0)
-    assert factor == 1.0
-    
-    # With lower quality
-    factor = calculate_correctness_factor(1, 1, "QA", avg_quality=0.8)
-    assert factor == 0.8
-
-
-def test_correctness_qa_partial():
-    """QA: <100% correct → factor 0.0 (no score)"""
-    factor = calculate_correctness_factor(1, 2, "QA", avg_quality=1.0)
-    assert factor == 0.0
-
-
-def test_correctness_trake_full():
-    """TRAKE: 100% with quality → factor = quality"""
-    factor = calculate_correctness_factor(2, 2, "TR", avg_quality=1.0)
-    assert factor == 1.0
-    
-    # With lower quality
-    factor = calculate_correctness_factor(2, 2, "TR", avg_quality=0.9)
-    assert factor == 0.9
-
-
-def test_correctness_trake_partial_high():
-    """TRAKE: 50-99% → factor = quality * 0.5"""
-    factor = calculate_correctness_factor(1, 2, "TR", avg_quality=1.0)
-    assert factor == 0.5
-    
-    # With lower quality
-    factor = calculate_correctness_factor(1, 2, "TR", avg_quality=0.8)
-    assert factor == 0.4  # 0.8 * 0.5
-
-
-def test_correctness_trake_partial_75():
-    """TRAKE: 75% (3/4) → factor = quality * 0.5"""
-    factor = calculate_correctness_factor(3, 4, "TR", avg_quality=1.0)
-    assert factor == 0.5
-
-
-def test_correctness_trake_low():
-    """TRAKE: <50% → factor 0.0"""
-    factor = calculate_correctness_factor(1, 3, "TR", avg_quality=1.0)
-    assert factor == 0.0
+def test_tolerance_match_shared_candidate():
+    """Values nearest the same event are spread so every event gets matched"""
+    user = [18, 19]  # Both closest to event 2, but 18 is also within event 1
+    events = [(0, 10), (20, 30)]
+    matched, total, quality = check_match_with_tolerance(user, events, TOLERANCE_FRAMES)
+    assert matched == 2
+    assert total == 2
+    assert 0.5 <= quality < 1.0
 
 
-def test_final_score_perfect():
-    """Perfect submission: t=0, k=0, 100% correct, quality=1.0"""
-    params = ScoringParams()
-    result = calculate_final_score(2, 2, "KIS", 0, 0, params, avg_quality=1.0)
-    assert result["score"] == 100.0
-    assert result["penalty"] == 0
-    assert result["correctness_factor"] == 1.0
-    assert result["time_factor"] == 1.0
-    assert result["match_quality"] == 1.0
+def test_tolerance_match_repeated_value():
+    """A repeated value (KIS start == end) is one candidate and covers one event"""
+    user = [5000, 5000]  # Within tolerance of both events
+    events = [(4890, 5000), (5001, 5020)]
+    matched, total, quality = check_match_with_tolerance(user, events, TOLERANCE_MS)
+    assert matched == 1
+    assert total == 2
 
 
-def test_final_score_with_quality():
-    """Score affected by match quality"""
-    params = ScoringParams()
-    result = calculate_final_score(2, 2, "KIS", 0, 0, params, avg_quality=0.75)
+def test_score_submission_kis_single_timestamp_two_events():
+    """One KIS answer (start == end) must not score a two-event question"""
+    gt = GroundTruth(stt=1, type="KIS", scene_id="L26", video_id="V017", points=[4890, 5000, 5001, 5020])
+    body = {"answerSets": [{"answers": [{"mediaItemName": "L26_V017", "start": "5000", "end": "5000"}]}]}
+    result = score_submission(normalize_kis(body, 1), gt, 0, 0, ScoringParams())
+    assert result.score == 0.0
+    assert result.matched_events < result.total_events
+
+
+# (matched, total, task_type, avg_quality, expected factor)
+CORRECTNESS_CASES = [
+    # KIS / QA: 100% correct → factor = quality, anything less → 0.0
+    pytest.param(2, 2, "KIS", 1.0, 1.0, id="kis-full"),
+    pytest.param(2, 2, "KIS", 0.75, 0.75, id="kis-full-low-quality"),
+    pytest.param(1, 2, "KIS", 1.0, 0.0, id="kis-partial"),
+    pytest.param(1, 1, "QA", 1.0, 1.0, id="qa-full"),
+    pytest.param(1, 1, "QA", 0.8, 0.8, id="qa-full-low-quality"),
+    pytest.param(1, 2, "QA", 1.0, 0.0, id="qa-partial"),
+    # TRAKE: 100% → quality, 50-99% → quality * 0.5, <50% → 0.0
+    pytest.param(2, 2, "TR", 1.0, 1.0, id="trake-full"),
+    pytest.param(2, 2, "TR", 0.9, 0.9, id="trake-full-low-quality"),
+    pytest.param(1, 2, "TR", 1.0, 0.5, id="trake-partial-50"),
+    pytest.param(1, 2, "TR", 0.8, 0.4, id="trake-partial-50-low-quality"),
+    pytest.param(3, 4, "TR", 1.0, 0.5, id="trake-partial-75"),
+    pytest.param(1, 3, "TR", 1.0, 0.0, id="trake-low"),
+]
+
+
+@pytest.mark.parametrize("matched,total,task_type,avg_quality,expected", CORRECTNESS_CASES)
+def test_correctness_factor(matched, total, task_type, avg_quality, expected):
+    """Correctness factor per task type and match ratio"""
+    factor = calculate_correctness_factor(matched, total, task_type, avg_quality=avg_quality)
+    assert factor == expected
+
+
+# (matched, total, task_type, t_submit, k, avg_quality, expected ScoreResult fields)
+FINAL_SCORE_CASES = [
+    pytest.param(2, 2, "KIS", 0, 0, 1.0, {
+        "score": 100.0, "penalty": 0, "correctness_factor": 1.0,
+        "time_factor": 1.0, "match_quality": 1.0,
+    }, id="perfect"),
     # base = 100, correctness = 0.75 (quality-adjusted), final = 75
-    assert result["score"] == 75.0
-    assert result["match_quality"] == 0.75
-
-
-def test_final_score_with_penalty():
-    """Score with penalty: k=2, perfect timing and correctness"""
-    params = ScoringParams()
-    result = calculate_final_score(2, 2, "KIS", 0, 2, params, avg_quality=1.0)
+    pytest.param(2, 2, "KIS", 0, 0, 0.75, {"score": 75.0, "match_quality": 0.75}, id="quality"),
     # base_score = 100, penalty = 20, final = 80
-    assert result["score"] == 80.0
-    assert result["penalty"] == 20.0
-
-
-def test_final_score_with_time():
-    """Score with time factor: t=150s (half)"""
-    params = ScoringParams()
-    result = calculate_final_score(2, 2, "KIS", 150, 0, params, avg_quality=1.0)
+    pytest.param(2, 2, "KIS", 0, 2, 1.0, {"score": 80.0, "penalty": 20.0}, id="penalty"),
     # fT = 0.5, base = 50 + (100-50)*0.5 = 75
-    assert result["score"] == 75.0
-    assert result["time_factor"] == 0.5
-
-
-def test_final_score_trake_partial():
-    """TRAKE partial: 50% correct, quality-adjusted"""
-    params = ScoringParams()
-    result = calculate_final_score(1, 2, "TR", 0, 0, params, avg_quality=1.0)
+    pytest.param(2, 2, "KIS", 150, 0, 1.0, {"score": 75.0, "time_factor": 0.5}, id="time"),
     # base = 100, correctness = 0.5 (50% match), final = 50
-    assert result["score"] == 50.0
-    assert result["correctness_factor"] == 0.5
-
-
-def test_final_score_time_and_penalty():
-    """Combined: time factor + penalty"""
-    params = ScoringParams()
-    result = calculate_final_score(2, 2, "KIS", 150, 1, params, avg_quality=1.0)
+    pytest.param(1, 2, "TR", 0, 0, 1.0, {"score": 50.0, "correctness_factor": 0.5}, id="trake-partial"),
     # fT=0.5, base=75, penalty=10, final=65
-    assert result["score"] == 65.0
-    assert result["penalty"] == 10.0
-    assert result["time_factor"] == 0.5
+    pytest.param(2, 2, "KIS", 150, 1, 1.0, {
+        "score": 65.0, "penalty": 10.0, "time_factor": 0.5,
+    }, id="time-and-penalty"),
+    # KIS partial match → 0 score
+    pytest.param(1, 2, "KIS", 0, 0, 1.0, {"score": 0.0, "correctness_factor": 0.0}, id="kis-incorrect"),
+    # base = 100, penalty = 150, max(0, 100-150) = 0
+    pytest.param(2, 2, "KIS", 0, 15, 1.0, {"score": 0.0}, id="high-penalty"),
+    # At time limit: fT = 0, base = 50 + 50*0 = 50
+    pytest.param(2, 2, "KIS", 300, 0, 1.0, {"score": 50.0, "time_factor": 0.0}, id="at-time-limit"),
+]
 
 
-def test_final_score_kis_incorrect():
-    """KIS: Partial match → 0 score"""
-    params = ScoringParams()
-    result = calculate_final_score(1, 2, "KIS", 0, 0, params, avg_quality=1.0)
-    assert result["score"] == 0.0
-    assert result["correctness_factor"] == 0.0
-
-
-def test_final_score_high_penalty():
-    """Very high penalty can bring score to 0"""
-    params = ScoringParams()
-    result = calculate_final_score(2, 2, "KIS", 0, 15, params, avg_quality=1.0)
-    # base = 100, penalty = 150, max(0, 100-150) = 0
-    assert result["score"] == 0.0
+@pytest.mark.parametrize("matched,total,task_type,t_submit,k,avg_quality,expected", FINAL_SCORE_CASES)
+def test_final_score(matched, total, task_type, t_submit, k, avg_quality, expected):
+    """calculate_final_score fields for a table of submissions"""
+    result = calculate_final_score(matched, total, task_type, t_submit, k, ScoringParams(), avg_quality=avg_quality)
+    for field, value in expected.items():
+        assert getattr(result, field) == value, field
 
 
 def test_final_score_trake_with_time_and_penalty():
@@ -220,14 +177,5 @@ def test_final_score_trake_with_time_and_penalty():
     # score_before = 73.33
     # correctness = 0.5 (2/3 = 66% → 50-99%)
     # final = 73.33 * 0.5 = 36.67
-    assert 36 <= result["score"] <= 37
-    assert result["correctness_factor"] == 0.5
-
-
-def test_final_score_at_time_limit():
-    """At time limit, time factor = 0, base score = p_base"""
-    params = ScoringParams()
-    result = calculate_final_score(2, 2, "KIS", 300, 0, params)
-    # fT = 0, base = 50 + 50*0 = 50
-    assert result["score"] == 50.0
-    assert result["time_factor"] == 0.0
+    assert 36 <= result.score <= 37
+    assert result.correctness_factor == 0.5